@@ -44,7 +44,8 @@ TERMINAL_COMMAND_INDICATORS: List[str] = [
 
 # Regex pattern matching lines containing only box-drawing and block characters
 # Used to filter out terminal UI borders and decorations
-BOX_CHARS_PATTERN = re.compile(r'^[╭╮╯╰│─╗╔║╚╝═█▇▆▅▄▃▂▁░▒▓\s]+$')
+BOX_CHARS = '╭╮╯╰│─╗╔║╚╝═█▇▆▅▄▃▂▁░▒▓'
+BOX_CHARS_PATTERN = re.compile(rf'^[{BOX_CHARS}\s]+$')
 
 # Default workspace path for bots and terminal sessions
 DEFAULT_WORKSPACE_PATH = os.environ.get('DEFAULT_WORKSPACE', os.path.expanduser("~/Projects/POC'S/ai-chat-app"))
@@ -73,6 +74,12 @@ FILE_STORAGE_BASE_DIR = os.environ.get('FILE_STORAGE_DIR',
     os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data'))
 FILE_STORAGE_ENABLED = os.environ.get('FILE_STORAGE_ENABLED', 'true').lower() == 'true'
 
+# Cross-process file locks (<doc>.json.lock) around every storage read and write.
+# Off by default: within one process, in-process reader/writer locks are enough.
+# Set to true when several processes share FILE_STORAGE_DIR, e.g. the web app
+# running alongside start_slack.py or start_telegram.py
+FILE_STORAGE_MULTIPROCESS_LOCKS = os.environ.get('FILE_STORAGE_MULTIPROCESS_LOCKS', 'false').lower() == 'true'
+
 # MongoDB Configuration (legacy, used for migration)
 MONGODB_URI = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017')
 MONGODB_DB_NAME = os.environ.get('MONGODB_DB_NAME', 'ai_chat_app')
@@ -214,6 +221,21 @@ settings = Settings()
 # Slack Integration Configuration
 # =============================================================================
 
+
+def _positive_float_env(name: str, default: float) -> float:
+    raw = os.environ.get(name)
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        value = None
+    if value is None or not 0 < value < float('inf'):
+        log.warning(f"Invalid {name}={raw!r}, expected a positive number of seconds; using {default}")
+        return default
+    return value
+
+
 # Slack tokens (set via environment variables for security)
 SLACK_BOT_TOKEN = os.environ.get('SLACK_BOT_TOKEN')  # xoxb-...
 SLACK_APP_TOKEN = os.environ.get('SLACK_APP_TOKEN')  # xapp-... (only for Socket Mode)
@@ -234,3 +256,16 @@ SLACK_ENABLED = os.environ.get('SLACK_ENABLED', 'false').lower() == 'true'
 # - poller: Simple polling (no webhooks needed)
 # - http: Uses webhook URLs (requires public HTTPS endpoint)
 SLACK_MODE = os.environ.get('SLACK_MODE', 'socket')
+
+# Socket Mode keepalive: seconds between pings; the connection is treated as stale after 4 missed intervals
+SLACK_SOCKET_PING_INTERVAL = _positive_float_env('SLACK_SOCKET_PING_INTERVAL', 10.0)
+
+# Poller mode: poll every MIN seconds while messages arrive, backing off up to MAX while idle
+SLACK_POLL_INTERVAL_MIN = _positive_float_env('SLACK_POLL_INTERVAL_MIN', 2.0)
+SLACK_POLL_INTERVAL_MAX = _positive_float_env('SLACK_POLL_INTERVAL_MAX', 30.0)
+if SLACK_POLL_INTERVAL_MAX < SLACK_POLL_INTERVAL_MIN:
+    log.warning(
+        f"SLACK_POLL_INTERVAL_MAX ({SLACK_POLL_INTERVAL_MAX}) is below SLACK_POLL_INTERVAL_MIN "
+        f"({SLACK_POLL_INTERVAL_MIN}); polling every {SLACK_POLL_INTERVAL_MIN}s without back-off"
+    )
+    SLACK_POLL_INTERVAL_MAX = SLACK_POLL_INTERVAL_MIN
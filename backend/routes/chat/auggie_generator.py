@@ -235,8 +235,8 @@ class AuggieStreamGenerator(BaseStreamGenerator):
 
         for prefix_len in [50, 30, 20, 15]:
             msg_prefix = sanitized[:prefix_len] if len(sanitized) > prefix_len else sanitized
-            if msg_prefix in clean:
-                msg_pos = clean.rfind(msg_prefix)
+            msg_pos = clean.rfind(msg_prefix)
+            if msg_pos >= 0:
                 state.mark_message_echo_found(msg_pos)
                 log.info(f"Message echo found at position {msg_pos} (prefix_len={prefix_len})")
                 return
@@ -346,7 +346,7 @@ class AuggieStreamGenerator(BaseStreamGenerator):
 
         yield from self.finalize_content(state, final_content)
 
-        session.last_used = time.time()
+        session.last_used = time.monotonic()
         session.last_message = self.message
         session.last_response = final_content or ""
         SessionManager.cleanup_old()
@@ -142,6 +142,7 @@ class AuggieExecutor:
         fd = session.master_fd
         start_time = time.time()
         last_data_time = time.time()
+        clean = ""
 
         log.info(f"[EXECUTOR] Waiting for response to: {message[:50]}... (source={source})")
 
@@ -162,19 +163,19 @@ class AuggieExecutor:
                     chunk = os.read(fd, 8192).decode('utf-8', errors='ignore')
                     if chunk:
                         state.all_output += chunk
+                        clean = TextCleaner.strip_ansi(state.all_output)
                         last_data_time = time.time()
                 except (BlockingIOError, OSError):
                     pass
 
             # Check for end pattern (primary exit - same as main app)
             if state.all_output:
-                clean = TextCleaner.strip_ansi(state.all_output)
-
                 # Check message echo
                 if not state.saw_message_echo:
                     msg_prefix = sanitized[:30]
-                    if msg_prefix in clean:
-                        state.mark_message_echo_found(clean.rfind(msg_prefix))
+                    msg_pos = clean.rfind(msg_prefix)
+                    if msg_pos >= 0:
+                        state.mark_message_echo_found(msg_pos)
 
                 # Process content
                 if state.saw_message_echo:
@@ -1,14 +1,28 @@
 import os
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import takewhile
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Dict, FrozenSet, Iterator, Optional, Tuple
+
+import orjson
 
 log = logging.getLogger('session_tracker')
 
 AUGMENT_SESSIONS_DIR = os.path.expanduser('~/.augment/sessions')
 
+SCAN_MAX_WORKERS = 8
+CONCURRENT_SCAN_MIN = 16
+
+SessionWorkspaces = Tuple[Optional[str], FrozenSet[str], Optional[str]]
+
+# Parsed workspaces per session file, keyed on path and checked against mtime and size.
+# Entries for files no longer in the directory are dropped on each full scan, so the
+# cache holds at most one entry per session file
+_session_cache: Dict[str, Tuple[int, int, SessionWorkspaces]] = {}
+_scan_executor = ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS, thread_name_prefix='session-scan')
+
 
 def session_exists(session_id: str) -> bool:
     if not session_id:
@@ -17,79 +31,126 @@ def session_exists(session_id: str) -> bool:
     return session_file.exists()
 
 
-def get_latest_session_for_workspace(workspace: str, after_time: datetime = None) -> Optional[str]:
-    sessions_dir = Path(AUGMENT_SESSIONS_DIR)
-    if not sessions_dir.exists():
+def _request_nodes(data: dict) -> list:
+    chat_history = data.get('chatHistory', [])
+    if not chat_history:
+        return []
+    return chat_history[0].get('exchange', {}).get('request_nodes', [])
+
+
+def _parse_session_workspaces(path: str) -> SessionWorkspaces:
+    # Returns the session id, the normalized roots of the first IDE-state node, and the
+    # first workspace root found in any IDE-state node; the chat history itself is dropped
+    with open(path, 'rb') as f:
+        data = orjson.loads(f.read())
+
+    roots = None
+    for node in _request_nodes(data):
+        if node.get('type') == 4:
+            workspace_folders = node.get('ide_state_node', {}).get('workspace_folders', [])
+            if roots is None:
+                roots = frozenset(
+                    os.path.normpath(root)
+                    for root in (folder.get('folder_root', '') for folder in workspace_folders)
+                    if isinstance(root, str)
+                )
+            if workspace_folders:
+                return data.get('sessionId'), roots, workspace_folders[0].get('folder_root')
+    return data.get('sessionId'), roots or frozenset(), None
+
+
+def _cached_session_workspaces(path: str, st: os.stat_result) -> Optional[SessionWorkspaces]:
+    entry = _session_cache.get(path)
+    if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+        return entry[2]
+    return None
+
+
+def _load_session_workspaces(path: str, st: os.stat_result) -> SessionWorkspaces:
+    workspaces = _cached_session_workspaces(path, st)
+    if workspaces is None:
+        workspaces = _parse_session_workspaces(path)
+        _session_cache[path] = (st.st_mtime_ns, st.st_size, workspaces)
+    return workspaces
+
+
+def _try_session_workspaces(candidate: Tuple[os.stat_result, str]) -> Optional[SessionWorkspaces]:
+    st, path = candidate
+    try:
+        return _load_session_workspaces(path, st)
+    except (orjson.JSONDecodeError, KeyError, OSError):
         return None
 
-    workspace = os.path.normpath(os.path.expanduser(workspace))
-    best_session = None
-    best_modified = None
 
-    for session_file in sessions_dir.glob('*.json'):
-        try:
-            stat = session_file.stat()
-            modified_time = datetime.fromtimestamp(stat.st_mtime)
+def _session_files_newest_first() -> list:
+    # scandir order breaks mtime ties, matching the previous glob-order scan
+    candidates = []
+    with os.scandir(AUGMENT_SESSIONS_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json') and not entry.name.startswith('.'):
+                try:
+                    if entry.is_file():
+                        candidates.append((entry.stat(), entry.path))
+                except OSError:
+                    continue
+    candidates.sort(key=lambda candidate: candidate[0].st_mtime, reverse=True)
+    return candidates
 
-            if after_time and modified_time < after_time:
-                continue
 
-            with open(session_file, 'r') as f:
-                data = json.load(f)
+def _prune_session_cache(candidates: list) -> None:
+    for path in _session_cache.keys() - {path for _, path in candidates}:
+        _session_cache.pop(path, None)
 
-            chat_history = data.get('chatHistory', [])
-            if not chat_history:
-                continue
 
-            first_exchange = chat_history[0]
-            exchange = first_exchange.get('exchange', {})
-            request_nodes = exchange.get('request_nodes', [])
+def _parse_newest_first(candidates: list) -> Iterator[Optional[SessionWorkspaces]]:
+    if len(candidates) < CONCURRENT_SCAN_MIN:
+        yield from map(_try_session_workspaces, candidates)
+        return
+    # Parse in newest-first batches so a recent match does not pay for the whole directory
+    for start in range(0, len(candidates), SCAN_MAX_WORKERS):
+        yield from _scan_executor.map(_try_session_workspaces, candidates[start:start + SCAN_MAX_WORKERS])
 
-            for node in request_nodes:
-                if node.get('type') == 4:
-                    ide_state = node.get('ide_state_node', {})
-                    workspace_folders = ide_state.get('workspace_folders', [])
-                    for folder in workspace_folders:
-                        folder_root = folder.get('folder_root', '')
-                        if os.path.normpath(folder_root) == workspace:
-                            if best_modified is None or modified_time > best_modified:
-                                best_session = data.get('sessionId')
-                                best_modified = modified_time
-                    break
-        except (json.JSONDecodeError, KeyError, OSError):
-            continue
 
-    return best_session
+def _first_session_in(results, workspace: str) -> Optional[str]:
+    for result in results:
+        if result and workspace in result[1]:
+            return result[0]
+    return None
 
 
-def get_session_workspace(session_id: str) -> Optional[str]:
-    if not session_id:
+def get_latest_session_for_workspace(workspace: str, after_time: datetime = None) -> Optional[str]:
+    try:
+        candidates = _session_files_newest_first()
+    except OSError:
         return None
+    _prune_session_cache(candidates)
 
-    session_file = Path(AUGMENT_SESSIONS_DIR) / f"{session_id}.json"
-    if not session_file.exists():
+    workspace = os.path.normpath(os.path.expanduser(workspace))
+
+    if after_time:
+        candidates = takewhile(
+            lambda candidate: datetime.fromtimestamp(candidate[0].st_mtime) >= after_time, candidates
+        )
+
+    # Cached files are checked inline; only files that changed since their last parse are
+    # read, and only those newer than the newest cached match
+    misses = []
+    for st, path in candidates:
+        workspaces = _cached_session_workspaces(path, st)
+        if workspaces is None:
+            misses.append((st, path))
+        elif workspace in workspaces[1]:
+            return _first_session_in(_parse_newest_first(misses), workspace) or workspaces[0]
+    return _first_session_in(_parse_newest_first(misses), workspace)
+
+
+def get_session_workspace(session_id: str) -> Optional[str]:
+    if not session_id:
         return None
 
+    session_file = os.path.join(AUGMENT_SESSIONS_DIR, f"{session_id}.json")
     try:
-        with open(session_file, 'r') as f:
-            data = json.load(f)
-
-        chat_history = data.get('chatHistory', [])
-        if not chat_history:
-            return None
-
-        first_exchange = chat_history[0]
-        exchange = first_exchange.get('exchange', {})
-        request_nodes = exchange.get('request_nodes', [])
-
-        for node in request_nodes:
-            if node.get('type') == 4:
-                ide_state = node.get('ide_state_node', {})
-                workspace_folders = ide_state.get('workspace_folders', [])
-                if workspace_folders:
-                    return workspace_folders[0].get('folder_root')
-    except (json.JSONDecodeError, KeyError, OSError):
+        _, _, session_workspace = _load_session_workspaces(session_file, os.stat(session_file))
+    except (orjson.JSONDecodeError, KeyError, OSError):
         return None
-
-    return None
-
+    return session_workspace
@@ -7,7 +7,7 @@ from typing import Optional, Callable
 from dataclasses import dataclass
 
 from backend.services.bots.base import BaseBot, BaseBotConfig
-from backend.config import DEFAULT_WORKSPACE_PATH, BOT_MAX_MESSAGE_LENGTH_SLACK
+from backend.config import DEFAULT_WORKSPACE_PATH, BOT_MAX_MESSAGE_LENGTH_SLACK, SLACK_SOCKET_PING_INTERVAL
 
 log = logging.getLogger('slack.bot')
 
@@ -16,6 +16,7 @@ log = logging.getLogger('slack.bot')
 class SlackBotConfig(BaseBotConfig):
     app_token: str = None
     signing_secret: str = None
+    ping_interval: float = None
 
     def __post_init__(self):
         self.bot_token = self.bot_token or os.environ.get('SLACK_BOT_TOKEN')
@@ -23,6 +24,8 @@ class SlackBotConfig(BaseBotConfig):
         self.signing_secret = self.signing_secret or os.environ.get('SLACK_SIGNING_SECRET')
         self.workspace = self.workspace or os.environ.get('SLACK_WORKSPACE', DEFAULT_WORKSPACE_PATH)
         self.model = self.model or os.environ.get('SLACK_MODEL')
+        if self.ping_interval is None:
+            self.ping_interval = SLACK_SOCKET_PING_INTERVAL
 
     @property
     def is_socket_mode(self) -> bool:
@@ -202,9 +205,11 @@ class SlackBot(BaseBot):
         self._ensure_initialized()
 
         from slack_bolt.adapter.socket_mode import SocketModeHandler
-        self._handler = SocketModeHandler(self._app, self.config.app_token)
+        self._handler = SocketModeHandler(
+            self._app, self.config.app_token, ping_interval=self.config.ping_interval
+        )
 
-        log.info("[SLACK BOT] Starting in Socket Mode...")
+        log.info(f"[SLACK BOT] Starting in Socket Mode (ping interval {self.config.ping_interval}s)...")
         self._running = True
 
         if blocking:
@@ -1,12 +1,11 @@
 import os
 import re
-import time
 import logging
 import threading
 from typing import Optional, Set
 from dataclasses import dataclass, field
 
-from backend.config import DEFAULT_WORKSPACE_PATH
+from backend.config import DEFAULT_WORKSPACE_PATH, SLACK_POLL_INTERVAL_MIN, SLACK_POLL_INTERVAL_MAX
 
 log = logging.getLogger('slack.poller')
 
@@ -40,11 +39,13 @@ class SlackPoller:
     channel_id: str = None
     workspace: str = None
     model: str = None
-    poll_interval: float = 2.0
+    poll_interval: float = SLACK_POLL_INTERVAL_MIN
+    max_poll_interval: float = SLACK_POLL_INTERVAL_MAX
     repository: object = None
 
     _processed_messages: Set[str] = field(default_factory=set)
     _running: bool = False
+    _stop_event: threading.Event = field(default_factory=threading.Event)
     _thread: Optional[threading.Thread] = None
     _client = None
     _executor = None
@@ -167,10 +168,20 @@ class SlackPoller:
             log.exception(f"[SLACK] Execution error: {e}")
             self._send_reply(f"❌ Error: {str(e)}", thread_ts=ts)
     
+    def _next_interval(self, current: float, had_messages: bool) -> float:
+        # Back off while the channel is idle, snap back as soon as it is active
+        if had_messages:
+            return self.poll_interval
+        return max(self.poll_interval, min(current * 2, self.max_poll_interval))
+
     def _poll_loop(self):
         self._ensure_client()
         bot_user_id = self._get_bot_user_id()
-        log.info(f"[SLACK] Polling started (channel: {self.channel_id}, interval: {self.poll_interval}s)")
+        log.info(
+            f"[SLACK] Polling started (channel: {self.channel_id}, "
+            f"interval: {self.poll_interval}-{self.max_poll_interval}s)"
+        )
+        interval = self.poll_interval
         
         while self._running:
             messages = self._fetch_new_messages(bot_user_id)
@@ -180,7 +191,9 @@ class SlackPoller:
                 if self._running:
                     self._process_message(msg)
             
-            time.sleep(self.poll_interval)
+            interval = self._next_interval(interval, bool(messages))
+            # Wakes immediately on stop() instead of finishing a backed-off sleep
+            self._stop_event.wait(interval)
     
     def start(self, blocking: bool = False):
         if not self.bot_token:
@@ -189,6 +202,7 @@ class SlackPoller:
             raise ValueError("Set SLACK_CHANNEL_ID environment variable")
         
         self._running = True
+        self._stop_event.clear()
         
         if blocking:
             self._poll_loop()
@@ -199,5 +213,6 @@ class SlackPoller:
     
     def stop(self):
         self._running = False
+        self._stop_event.set()
         log.info("[SLACK] Poller stopped")
 
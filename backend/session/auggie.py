@@ -6,6 +6,7 @@ import subprocess
 import threading
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 
 from backend.config import get_auggie_model_id, BOT_SESSION_TIMEOUT_MINUTES
@@ -15,11 +16,13 @@ log = logging.getLogger('session')
 
 _sessions = {}
 _lock = threading.Lock()
-_cleanup_thread = None
-_cleanup_stop_event = threading.Event()
+_last_sweep = float('-inf')
+_sweep_lock = threading.Lock()
+_sweep_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='auggie-cleanup')
 
 STALE_PROCESS_AGE_MINUTES = BOT_SESSION_TIMEOUT_MINUTES
 CLEANUP_INTERVAL_SECONDS = 300
+SESSION_IDLE_SECONDS = 600
 MAX_AUGGIE_PROCESSES = 3
 
 AUGGIE_PROMPT_PATTERNS = [
@@ -27,6 +30,24 @@ AUGGIE_PROMPT_PATTERNS = [
     re.compile(r'>\s*$'),
 ]
 
+AUGGIE_NVM_BIN = '/home/dell/.nvm/versions/node/v22.22.0/bin'
+AUGGIE_CANDIDATE_PATHS = [
+    f'{AUGGIE_NVM_BIN}/auggie',
+    os.path.expanduser('~/.nvm/versions/node/v22.22.0/bin/auggie'),
+    '/usr/local/bin/auggie',
+    '/usr/bin/auggie'
+]
+
+
+def _resolve_auggie_path():
+    for path in AUGGIE_CANDIDATE_PATHS:
+        if os.path.exists(path):
+            return path
+    return 'auggie'
+
+
+_AUGGIE_PATH = _resolve_auggie_path()
+
 
 class AuggieSession(BasePtySession):
     def __init__(self, workspace: str, model: Optional[str] = None, session_id: Optional[str] = None):
@@ -36,18 +57,7 @@ class AuggieSession(BasePtySession):
         return 100, 200
 
     def get_command(self) -> List[str]:
-        auggie_cmd = 'auggie'
-        for path in [
-            '/home/dell/.nvm/versions/node/v22.22.0/bin/auggie',
-            os.path.expanduser('~/.nvm/versions/node/v22.22.0/bin/auggie'),
-            '/usr/local/bin/auggie',
-            '/usr/bin/auggie'
-        ]:
-            if os.path.exists(path):
-                auggie_cmd = path
-                break
-
-        cmd = [auggie_cmd]
+        cmd = [_AUGGIE_PATH]
 
         if self.session_id:
             from backend.session.persistence import session_manager
@@ -65,14 +75,12 @@ class AuggieSession(BasePtySession):
         return cmd
 
     def get_env(self) -> dict:
+        # Read os.environ per spawn so load_dotenv and runtime token changes reach new sessions
         env = os.environ.copy()
-        nvm_bin = '/home/dell/.nvm/versions/node/v22.22.0/bin'
-        if nvm_bin not in env.get('PATH', ''):
-            env['PATH'] = nvm_bin + ':' + env.get('PATH', '/usr/bin:/bin')
-        env.update({
-            'TERM': 'xterm-256color',
-            'AUGMENT_WORKSPACE': self.workspace
-        })
+        if AUGGIE_NVM_BIN not in env.get('PATH', ''):
+            env['PATH'] = AUGGIE_NVM_BIN + ':' + env.get('PATH', '/usr/bin:/bin')
+        env['TERM'] = 'xterm-256color'
+        env['AUGMENT_WORKSPACE'] = self.workspace
         return env
 
     def get_prompt_patterns(self) -> List:
@@ -144,9 +152,12 @@ class AuggieSession(BasePtySession):
         log.warning(f"[SESSION] Timeout waiting for prompt. Output so far: {repr(output[:200])}")
         return False, output
 
+    def cleanup(self) -> None:
+        super().cleanup()
+        _schedule_cleanup_sweep()
+
     def drain_output(self, timeout: float = 1.0) -> int:
-        output = super().drain_output(timeout)
-        drained = len(output.encode('utf-8'))
+        drained = self.discard_output(timeout)
         if drained > 0:
             log.info(f"[SESSION] drain_output: drained {drained} bytes")
         return drained
@@ -203,12 +214,25 @@ def _get_auggie_processes():
 
 
 def _get_tracked_pids():
-    with _lock:
-        return {s.process.pid for s in _sessions.values() if s.process and s.is_alive()}
+    pids = set()
+    for session in list(_sessions.values()):
+        process = session.process
+        if process and process.poll() is None:
+            pids.add(process.pid)
+    return pids
+
+
+def _can_reuse(session, model=None, session_id=None):
+    if session_id and session.session_id != session_id:
+        return False
+    if model and session.model != model:
+        return False
+    return session.is_alive()
 
 
-def cleanup_stale_auggie_processes(force_aggressive=False):
-    tracked_pids = _get_tracked_pids()
+def cleanup_stale_auggie_processes(force_aggressive=False, tracked_pids=None):
+    if tracked_pids is None:
+        tracked_pids = _get_tracked_pids()
     processes = _get_auggie_processes()
 
     if not processes:
@@ -282,34 +306,38 @@ def cleanup_stale_auggie_processes(force_aggressive=False):
     return killed_count
 
 
-def _cleanup_thread_func():
-    log.info("[CLEANUP] Background cleanup thread started")
-    while not _cleanup_stop_event.is_set():
-        try:
-            cleanup_stale_auggie_processes()
-        except Exception as e:
-            log.error(f"[CLEANUP] Error in cleanup thread: {e}")
-
-        # Wait for interval or stop event
-        _cleanup_stop_event.wait(CLEANUP_INTERVAL_SECONDS)
-
-    log.info("[CLEANUP] Background cleanup thread stopped")
+def _run_cleanup_sweep():
+    try:
+        cleanup_stale_auggie_processes()
+    except Exception as e:
+        log.error(f"[CLEANUP] Error in cleanup sweep: {e}")
 
 
-def start_cleanup_thread():
-    global _cleanup_thread
-    if _cleanup_thread is None or not _cleanup_thread.is_alive():
-        _cleanup_stop_event.clear()
-        _cleanup_thread = threading.Thread(target=_cleanup_thread_func, daemon=True)
-        _cleanup_thread.start()
-        log.info("[CLEANUP] Started background cleanup thread")
+def _schedule_cleanup_sweep():
+    global _last_sweep
+    now = time.monotonic()
+    with _sweep_lock:
+        if now - _last_sweep < CLEANUP_INTERVAL_SECONDS:
+            return
+        _last_sweep = now
+    log.debug("[CLEANUP] Scheduling background cleanup sweep")
+    _sweep_executor.submit(_run_cleanup_sweep)
 
 
 class SessionManager:
     @staticmethod
     def get_or_create(workspace, model=None, session_id=None, force_new=False):
-        # Ensure cleanup thread is running
-        start_cleanup_thread()
+        _schedule_cleanup_sweep()
+
+        session = _sessions.get(workspace)
+        if session and not force_new and _can_reuse(session, model, session_id):
+            with _lock:
+                # Replacements tear down and swap the entry while holding _lock,
+                # so only hand the session out if it is still the current one.
+                if _sessions.get(workspace) is session:
+                    log.debug(f"[SESSION] Reusing live session for workspace={workspace} (pid={session.process.pid if session.process else None})")
+                    session.last_used = time.monotonic()
+                    return session, False
 
         with _lock:
             log.info(f"[SESSION] get_or_create called for workspace={workspace}, model={model}, session_id={session_id}, force_new={force_new}")
@@ -318,7 +346,7 @@ class SessionManager:
             if workspace in _sessions:
                 session = _sessions[workspace]
                 is_alive = session.is_alive()
-                log.info(f"[SESSION] Found existing session: is_alive={is_alive}, pid={session.process.pid if session.process else None}, last_used={time.time() - session.last_used:.1f}s ago")
+                log.info(f"[SESSION] Found existing session: is_alive={is_alive}, pid={session.process.pid if session.process else None}, last_used={time.monotonic() - session.last_used:.1f}s ago")
 
                 if is_alive:
                     # Force new session if requested (new chat wants fresh context)
@@ -338,7 +366,7 @@ class SessionManager:
                         session.cleanup()
                         _sessions[workspace] = AuggieSession(workspace, model, session_id)
                         return _sessions[workspace], True
-                    session.last_used = time.time()
+                    session.last_used = time.monotonic()
                     return session, False
                 else:
                     log.warning(f"[SESSION] Session exists but process is dead, cleaning up")
@@ -351,17 +379,19 @@ class SessionManager:
 
     @staticmethod
     def cleanup_old():
+        tracked_pids = set()
         with _lock:
-            now = time.time()
+            now = time.monotonic()
             log.debug(f"[CLEANUP] cleanup_old called, checking {len(_sessions)} sessions")
 
-            old_sessions = [w for w, s in _sessions.items() if now - s.last_used > 600]
-            if old_sessions:
-                log.info(f"[CLEANUP] Found {len(old_sessions)} sessions older than 10 minutes: {old_sessions}")
+            for ws, session in list(_sessions.items()):
+                is_alive = session.is_alive()
+                if is_alive:
+                    tracked_pids.add(session.process.pid)
 
-            for ws in old_sessions:
-                session = _sessions[ws]
                 age_seconds = now - session.last_used
+                if age_seconds <= SESSION_IDLE_SECONDS:
+                    continue
 
                 # Don't delete sessions that have an active terminal open (in_use)
                 if session.in_use:
@@ -369,7 +399,7 @@ class SessionManager:
                     continue
                 # Don't delete sessions where the process is still alive - user may return
                 # Only delete sessions where the process has died
-                if session.is_alive():
+                if is_alive:
                     log.info(f"[CLEANUP] Skipping session {ws}: process still alive (PID: {session.process.pid}, age: {age_seconds:.0f}s)")
                     continue
 
@@ -378,7 +408,7 @@ class SessionManager:
                 del _sessions[ws]
 
         # Also clean up any orphaned OS processes
-        cleanup_stale_auggie_processes()
+        cleanup_stale_auggie_processes(tracked_pids=tracked_pids)
 
     @staticmethod
     def reset(workspace):
@@ -10,7 +10,7 @@ import logging
 import threading
 from abc import ABC, abstractmethod
 from subprocess import Popen
-from typing import Optional, Tuple, List
+from typing import Callable, Optional, Tuple, List
 
 log = logging.getLogger('session.base')
 
@@ -18,6 +18,7 @@ log = logging.getLogger('session.base')
 class BasePtySession(ABC):
     DEFAULT_ROWS = 24
     DEFAULT_COLS = 80
+    DRAIN_BUFFER_SIZE = 65536
 
     def __init__(self, workspace: str, model: Optional[str] = None, session_id: Optional[str] = None):
         self.workspace = os.path.expanduser(workspace)
@@ -29,8 +30,9 @@ class BasePtySession(ABC):
         self.in_use: bool = False
         self.last_message: str = ''
         self.last_response: str = ''
-        self.last_used: float = time.time()
+        self.last_used: float = time.monotonic()
         self.lock = threading.RLock()
+        self._drain_buf = bytearray(self.DRAIN_BUFFER_SIZE)
 
     @abstractmethod
     def get_command(self) -> List[str]:
@@ -77,7 +79,7 @@ class BasePtySession(ABC):
 
             fcntl.ioctl(master_fd, termios.TIOCSWINSZ, winsize)
             self.master_fd = master_fd
-            self.last_used = time.time()
+            self.last_used = time.monotonic()
 
             log.info(f"[{self.__class__.__name__}] Started PID: {self.process.pid}")
             return True
@@ -118,27 +120,45 @@ class BasePtySession(ABC):
 
         self.initialized = False
 
-    def drain_output(self, timeout: float = 1.0) -> str:
-        if not self.master_fd:
-            return ''
-
-        output = ''
+    def _drain(self, read_chunk: Callable[[], int], timeout: float) -> int:
+        # read_chunk consumes one read from master_fd and returns its byte count; 0 ends the drain
+        drained = 0
         end = time.time() + timeout
         while time.time() < end:
             if select.select([self.master_fd], [], [], 0.1)[0]:
                 try:
-                    chunk = os.read(self.master_fd, 8192).decode('utf-8', errors='ignore')
-                    if chunk:
-                        output += chunk
-                    else:
-                        break
+                    n = read_chunk()
                 except (BlockingIOError, OSError):
                     break
+                if not n:
+                    break
+                drained += n
             else:
                 time.sleep(0.05)
                 if not select.select([self.master_fd], [], [], 0.05)[0]:
                     break
-        return output
+        return drained
+
+    def drain_output(self, timeout: float = 1.0) -> str:
+        if not self.master_fd:
+            return ''
+
+        chunks = []
+
+        def read_chunk() -> int:
+            chunk = os.read(self.master_fd, 8192)
+            chunks.append(chunk)
+            return len(chunk)
+
+        self._drain(read_chunk, timeout)
+        return b''.join(chunks).decode('utf-8', errors='ignore')
+
+    def discard_output(self, timeout: float = 1.0) -> int:
+        if not self.master_fd:
+            return 0
+
+        buffers = [self._drain_buf]
+        return self._drain(lambda: os.readv(self.master_fd, buffers), timeout)
 
     def write(self, data: bytes) -> bool:
         if not self.master_fd:
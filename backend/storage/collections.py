@@ -1,13 +1,71 @@
+import copy
 import logging
-import uuid
+import os
+import time
+from itertools import islice
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Iterator, Tuple
 
 from .file_storage import FileStorage
 
 log = logging.getLogger('storage.collections')
 
+_iso_second_cache = (None, '')
+
+
+def _now_iso() -> str:
+    global _iso_second_cache
+    t = time.time()
+    sec = int(t)
+    cached_sec, prefix = _iso_second_cache
+    if cached_sec != sec:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(sec))
+        _iso_second_cache = (sec, prefix)
+    return f"{prefix}.{int((t - sec) * 1_000_000):06d}"
+
+
+def _new_id() -> str:
+    return os.urandom(4).hex()
+
+
+def _op_set(doc: dict, fields: dict) -> None:
+    doc.update(fields)
+
+
+def _op_unset(doc: dict, fields: dict) -> None:
+    for key in fields:
+        doc.pop(key, None)
+
+
+def _op_push(doc: dict, fields: dict) -> None:
+    for key, value in fields.items():
+        target = doc.setdefault(key, [])
+        if isinstance(value, dict) and '$each' in value:
+            target.extend(value['$each'])
+        else:
+            target.append(value)
+
+
+def _op_pull(doc: dict, fields: dict) -> None:
+    for key, value in fields.items():
+        current = doc.get(key)
+        if isinstance(current, list) and value in current:
+            doc[key] = [x for x in current if x != value]
+
+
+def _op_inc(doc: dict, fields: dict) -> None:
+    for key, value in fields.items():
+        doc[key] = doc.get(key, 0) + value
+
+
+_UPDATE_OPS = {
+    '$set': _op_set,
+    '$unset': _op_unset,
+    '$push': _op_push,
+    '$pull': _op_pull,
+    '$inc': _op_inc,
+}
+
 
 @dataclass
 class InsertResult:
@@ -63,48 +121,44 @@ class BaseCollection:
 
     def _apply_update(self, doc: dict, update: dict) -> dict:
         for op, fields in update.items():
-            if op == '$set':
-                for key, value in fields.items():
-                    doc[key] = value
-            elif op == '$unset':
-                for key in fields:
-                    doc.pop(key, None)
-            elif op == '$push':
-                for key, value in fields.items():
-                    if key not in doc:
-                        doc[key] = []
-                    doc[key].append(value)
-            elif op == '$pull':
-                for key, value in fields.items():
-                    if key in doc and isinstance(doc[key], list):
-                        doc[key] = [x for x in doc[key] if x != value]
-            elif op == '$inc':
-                for key, value in fields.items():
-                    doc[key] = doc.get(key, 0) + value
+            handler = _UPDATE_OPS.get(op)
+            if handler:
+                handler(doc, fields)
+            else:
+                log.warning(f"Unsupported update operator {op} ignored in {self.collection_name}")
         return doc
 
-    def find_one(self, filter: dict = None) -> Optional[dict]:
+    def _locate(self, filter: dict = None) -> Tuple[Optional[dict], Optional[str]]:
         if filter and 'id' in filter:
-            doc = self.storage.read(self.collection_name, filter['id'])
+            path = self.storage.path_for(self.collection_name, filter['id'])
+            doc = self.storage.read_at(path) if path else None
             if doc and self._match_filter(doc, filter):
-                return doc
-            return None
+                return doc, path
+            return None, None
 
-        for doc in self.storage.list_all(self.collection_name):
+        for path, doc in self.storage.iter_entries(self.collection_name):
             if self._match_filter(doc, filter):
-                return doc
-        return None
+                return doc, path
+        return None, None
+
+    def find_one(self, filter: dict = None) -> Optional[dict]:
+        doc, _ = self._locate(filter)
+        return doc
+
+    def _iter_matching(self, filter: dict = None) -> Iterator[dict]:
+        return (doc for doc in self.storage.iter_all(self.collection_name)
+                if self._match_filter(doc, filter))
 
     def find(self, filter: dict = None, sort: list = None, limit: int = None) -> list:
-        results = []
-        for doc in self.storage.list_all(self.collection_name):
-            if self._match_filter(doc, filter):
-                results.append(doc)
+        if not sort:
+            matches = self._iter_matching(filter)
+            return list(islice(matches, limit) if limit else matches)
 
-        if sort:
-            for sort_field, direction in reversed(sort):
-                reverse = direction == -1
-                results.sort(key=lambda x: x.get(sort_field, ''), reverse=reverse)
+        results = [doc for doc in self.storage.list_all(self.collection_name)
+                   if self._match_filter(doc, filter)]
+        for sort_field, direction in reversed(sort):
+            reverse = direction == -1
+            results.sort(key=lambda x: x.get(sort_field, ''), reverse=reverse)
 
         if limit:
             results = results[:limit]
@@ -113,9 +167,9 @@ class BaseCollection:
 
     def insert_one(self, document: dict) -> InsertResult:
         if 'id' not in document:
-            document['id'] = str(uuid.uuid4())[:8]
+            document['id'] = _new_id()
         if 'created_at' not in document:
-            document['created_at'] = datetime.utcnow().isoformat()
+            document['created_at'] = _now_iso()
         if 'updated_at' not in document:
             document['updated_at'] = document['created_at']
 
@@ -124,12 +178,12 @@ class BaseCollection:
         return InsertResult(inserted_id=document['id'])
 
     def update_one(self, filter: dict, update: dict, upsert: bool = False) -> UpdateResult:
-        doc = self.find_one(filter)
+        doc, path = self._locate(filter)
 
         if doc:
-            updated_doc = self._apply_update(doc.copy(), update)
-            updated_doc['updated_at'] = datetime.utcnow().isoformat()
-            self.storage.write(self.collection_name, doc['id'], updated_doc)
+            updated_doc = self._apply_update(doc, update)
+            updated_doc['updated_at'] = _now_iso()
+            self.storage.write_at(self.collection_name, doc['id'], path, updated_doc)
             return UpdateResult(matched_count=1, modified_count=1)
         elif upsert:
             new_doc = filter.copy()
@@ -140,9 +194,9 @@ class BaseCollection:
         return UpdateResult(matched_count=0, modified_count=0)
 
     def delete_one(self, filter: dict) -> DeleteResult:
-        doc = self.find_one(filter)
+        doc, path = self._locate(filter)
         if doc:
-            self.storage.delete(self.collection_name, doc['id'])
+            self.storage.unlink(self.collection_name, doc['id'], path)
             log.info(f"Deleted document {doc['id']} from {self.collection_name}")
             return DeleteResult(deleted_count=1)
         return DeleteResult(deleted_count=0)
@@ -157,7 +211,7 @@ class BaseCollection:
         return DeleteResult(deleted_count=count)
 
     def count_documents(self, filter: dict = None) -> int:
-        return len(self.find(filter))
+        return sum(1 for _ in self._iter_matching(filter))
 
 
 class ChatsCollection(BaseCollection):
@@ -173,13 +227,14 @@ class BotChatsCollection(BaseCollection):
 
     def find_one_and_update(self, filter: dict, update: dict, upsert: bool = False,
                             return_document: str = 'after') -> Optional[dict]:
-        doc = self.find_one(filter)
+        doc, path = self._locate(filter)
 
         if doc:
-            updated_doc = self._apply_update(doc.copy(), update)
-            updated_doc['updated_at'] = datetime.utcnow().isoformat()
-            self.storage.write(self.collection_name, doc['id'], updated_doc)
-            return updated_doc if return_document == 'after' else doc
+            return_after = return_document == 'after'
+            updated_doc = self._apply_update(doc if return_after else copy.deepcopy(doc), update)
+            updated_doc['updated_at'] = _now_iso()
+            self.storage.write_at(self.collection_name, doc['id'], path, updated_doc)
+            return updated_doc if return_after else doc
         elif upsert:
             new_doc = {}
             for key, value in filter.items():
@@ -187,8 +242,8 @@ class BotChatsCollection(BaseCollection):
                     new_doc[key] = value
             new_doc = self._apply_update(new_doc, update)
             if 'id' not in new_doc:
-                new_doc['id'] = str(uuid.uuid4())[:8]
-            new_doc['created_at'] = datetime.utcnow().isoformat()
+                new_doc['id'] = _new_id()
+            new_doc['created_at'] = _now_iso()
             new_doc['updated_at'] = new_doc['created_at']
             self.storage.write(self.collection_name, new_doc['id'], new_doc)
             return new_doc if return_document == 'after' else None
@@ -1,19 +1,48 @@
-import json
+import calendar
+import hashlib
 import logging
+import mmap
 import os
-from datetime import datetime
-from typing import Optional, Dict, Any
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterator, List, Set, Tuple
 
-from .locking import file_lock
+import orjson
+
+from .locking import write_lock
 from .index import StorageIndex
 
 log = logging.getLogger('storage.file_storage')
 
+DOC_DUMP_OPTIONS = (
+    orjson.OPT_APPEND_NEWLINE
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+DIR_CACHE_SIZE = 1024
+TMP_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+MMAP_READ_THRESHOLD = 1024 * 1024
+READ_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+CONCURRENT_READ_MIN = 32
+SAFE_DOC_ID_CHARS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_'
+_DATE_PREFIX_RE = re.compile(r'(\d{4})-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])(?=[T ]|$)')
+
+
+class _SanitizeTable(dict):
+    def __missing__(self, codepoint: int) -> str:
+        return '_'
+
+
+_SANITIZE_TABLE = _SanitizeTable({ord(c): c for c in SAFE_DOC_ID_CHARS})
+
 
 class FileStorage:
     def __init__(self, base_dir: str):
         self.base_dir = base_dir
         self._indexes: Dict[str, StorageIndex] = {}
+        self._dir_cache: Set[str] = set()
         os.makedirs(base_dir, exist_ok=True)
         log.info(f"FileStorage initialized at {base_dir}")
 
@@ -24,50 +53,81 @@ class FileStorage:
         return self._indexes[collection]
 
     def get_file_path(self, collection: str, doc_id: str, created_at: str = None) -> str:
+        year, month, day = self._date_parts(created_at)
+        safe_doc_id = self._sanitize_doc_id(doc_id)
+        return os.path.join(
+            self.base_dir, collection, year, month, day, f"{safe_doc_id}.json"
+        )
+
+    @staticmethod
+    def _date_parts(created_at: Optional[str]) -> Tuple[str, str, str]:
+        if isinstance(created_at, str):
+            match = _DATE_PREFIX_RE.match(created_at)
+            if match:
+                year, month, day = match.groups()
+                if int(day) <= calendar.monthrange(int(year), int(month))[1]:
+                    return year, month, day
         if created_at:
             try:
                 dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-            except (ValueError, TypeError) as e:
+            except (ValueError, TypeError, AttributeError) as e:
                 log.warning(f"Invalid created_at format '{created_at}': {e}, using current time")
-                dt = datetime.utcnow()
+                dt = datetime.now(timezone.utc)
         else:
-            dt = datetime.utcnow()
-
-        year = dt.strftime('%Y')
-        month = dt.strftime('%m')
-        day = dt.strftime('%d')
-
-        safe_doc_id = self._sanitize_doc_id(doc_id)
-        return os.path.join(
-            self.base_dir, collection, year, month, day, f"{safe_doc_id}.json"
-        )
+            dt = datetime.now(timezone.utc)
+        return dt.strftime('%Y'), dt.strftime('%m'), dt.strftime('%d')
 
     def _sanitize_doc_id(self, doc_id: str) -> str:
         if not doc_id:
             raise ValueError("doc_id cannot be empty")
-        safe_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
-        sanitized = ''.join(c if c in safe_chars else '_' for c in str(doc_id))
-        return sanitized[:100]
+        return str(doc_id).translate(_SANITIZE_TABLE)[:100]
 
     def _ensure_dir(self, path: str) -> None:
         dir_path = os.path.dirname(path)
+        if dir_path in self._dir_cache:
+            return
         os.makedirs(dir_path, exist_ok=True)
+        if len(self._dir_cache) >= DIR_CACHE_SIZE:
+            self._dir_cache.clear()
+        self._dir_cache.add(dir_path)
+
+    def _open_for_write(self, path: str, tmp_path: str) -> int:
+        try:
+            return os.open(tmp_path, TMP_OPEN_FLAGS, 0o644)
+        except FileNotFoundError:
+            self._dir_cache.discard(os.path.dirname(path))
+            self._ensure_dir(path)
+            return os.open(tmp_path, TMP_OPEN_FLAGS, 0o644)
+
+    @staticmethod
+    def _write_fd(fd: int, payload: bytes) -> None:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+
+    def path_for(self, collection: str, doc_id: str) -> Optional[str]:
+        if not doc_id:
+            return None
+        return self.get_index(collection).get(doc_id)
 
     def read(self, collection: str, doc_id: str) -> Optional[dict]:
         if not doc_id:
             log.warning("read called with empty doc_id")
             return None
 
-        index = self.get_index(collection)
-        path = index.get(doc_id)
-        if not path or not os.path.exists(path):
-            return None
+        path = self.path_for(collection, doc_id)
+        return self.read_at(path) if path else None
 
+    def read_at(self, path: str) -> Optional[dict]:
         try:
-            with file_lock(path):
-                with open(path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except json.JSONDecodeError as e:
+            with open(path, 'rb', buffering=0) as f:
+                if os.fstat(f.fileno()).st_size < MMAP_READ_THRESHOLD:
+                    return orjson.loads(f.readall())
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                    return orjson.loads(view)
+        except (FileNotFoundError, TypeError):
+            return None
+        except orjson.JSONDecodeError as e:
             log.error(f"Corrupted JSON in {path}: {e}")
             return None
         except (IOError, OSError) as e:
@@ -78,58 +138,133 @@ class FileStorage:
             return None
 
     def write(self, collection: str, doc_id: str, data: dict, created_at: str = None) -> bool:
+        if not self._is_writable(doc_id, data):
+            return False
+
+        path = self.get_file_path(collection, doc_id, created_at or data.get('created_at'))
+        return self.write_at(collection, doc_id, path, data)
+
+    def write_at(self, collection: str, doc_id: str, path: str, data: dict) -> bool:
+        index = self.get_index(collection)
+        if not self._store(index, doc_id, path, data):
+            return False
+        index.flush()
+        return True
+
+    def write_many(self, collection: str, items: List[Tuple[str, dict]]) -> int:
+        index = self.get_index(collection)
+        written = 0
+        for doc_id, data in items:
+            if not self._is_writable(doc_id, data):
+                continue
+            path = self.get_file_path(collection, doc_id, data.get('created_at'))
+            if self._store(index, doc_id, path, data):
+                written += 1
+        index.flush()
+        log.debug(f"Wrote {written}/{len(items)} documents to {collection}")
+        return written
+
+    @staticmethod
+    def _is_writable(doc_id: str, data: Any) -> bool:
         if not doc_id:
             log.error("write called with empty doc_id")
             return False
         if not isinstance(data, dict):
             log.error(f"write called with non-dict data: {type(data)}")
             return False
+        return True
 
-        path = self.get_file_path(collection, doc_id, created_at or data.get('created_at'))
+    def _store(self, index: StorageIndex, doc_id: str, path: str, data: dict) -> bool:
+        try:
+            payload = orjson.dumps(data, default=str, option=DOC_DUMP_OPTIONS)
+        except orjson.JSONEncodeError as e:
+            log.error(f"Failed to serialize document {doc_id}: {e}")
+            return False
+
+        content_hash = hashlib.blake2b(payload, digest_size=8).hexdigest()
+        entry = index.get_entry(doc_id)
+        if entry and entry['path'] == path and entry.get('hash') == content_hash and os.path.exists(path):
+            log.debug(f"Skipped unchanged document {doc_id}")
+            return True
+
+        if not self._write_file(path, payload):
+            return False
+        index.set(doc_id, path, data.get('created_at'), data.get('updated_at'), content_hash)
+        log.debug(f"Wrote document {doc_id} to {path}")
+        return True
+
+    def _write_file(self, path: str, payload: bytes) -> bool:
         self._ensure_dir(path)
 
+        tmp_path = f"{path}.tmp"
         try:
-            with file_lock(path):
-                with open(path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, default=str, ensure_ascii=False)
-
-            index = self.get_index(collection)
-            index.set(doc_id, path, data.get('created_at'), data.get('updated_at'))
-            index.save()
-            log.debug(f"Wrote document {doc_id} to {path}")
+            with write_lock(path):
+                fd = self._open_for_write(path, tmp_path)
+                try:
+                    self._write_fd(fd, payload)
+                finally:
+                    os.close(fd)
+                os.replace(tmp_path, path)
             return True
         except (IOError, OSError) as e:
             log.error(f"IO error writing {path}: {e}")
+            self._discard_tmp(tmp_path)
             return False
         except Exception as e:
             log.error(f"Unexpected error writing {path}: {e}")
+            self._discard_tmp(tmp_path)
             return False
 
+    def _discard_tmp(self, tmp_path: str) -> None:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log.warning(f"Failed to remove temp file {tmp_path}: {e}")
+
     def delete(self, collection: str, doc_id: str) -> bool:
-        index = self.get_index(collection)
-        path = index.get(doc_id)
+        path = self.path_for(collection, doc_id)
         if not path:
             return False
+        return self.unlink(collection, doc_id, path)
 
+    def unlink(self, collection: str, doc_id: str, path: str) -> bool:
+        index = self.get_index(collection)
         try:
             if os.path.exists(path):
-                with file_lock(path):
+                with write_lock(path):
                     os.remove(path)
             index.delete(doc_id)
-            index.save()
+            index.flush()
             return True
         except Exception as e:
             log.error(f"Failed to delete {path}: {e}")
             return False
 
-    def list_all(self, collection: str) -> list:
+    def iter_entries(self, collection: str) -> Iterator[Tuple[str, dict]]:
         index = self.get_index(collection)
-        result = []
-        for doc_id in index.all_ids():
-            doc = self.read(collection, doc_id)
+        for entry in index.all_entries().values():
+            path = entry['path']
+            doc = self.read_at(path)
             if doc:
-                result.append(doc)
-        return result
+                yield path, doc
+
+    def iter_all(self, collection: str) -> Iterator[dict]:
+        for _, doc in self.iter_entries(collection):
+            yield doc
+
+    def read_many(self, paths: List[str]) -> List[dict]:
+        if len(paths) < CONCURRENT_READ_MIN:
+            docs = map(self.read_at, paths)
+        else:
+            with ThreadPoolExecutor(max_workers=min(READ_MAX_WORKERS, len(paths))) as executor:
+                docs = list(executor.map(self.read_at, paths))
+        return [doc for doc in docs if doc]
+
+    def list_all(self, collection: str) -> list:
+        entries = self.get_index(collection).all_entries()
+        return self.read_many([entry['path'] for entry in entries.values()])
 
     def save_indexes(self) -> None:
         for index in self._indexes.values():
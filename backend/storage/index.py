@@ -1,32 +1,48 @@
-import json
 import logging
 import os
 import threading
 from datetime import datetime
-from typing import Dict, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Any, Tuple
 
-from .locking import file_lock
+import orjson
+
+from .locking import read_lock, write_lock
 
 log = logging.getLogger('storage.index')
 
+REBUILD_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 
 class StorageIndex:
+    COMPACT_THRESHOLD = 64
+
     def __init__(self, base_dir: str, collection: str):
         self.base_dir = base_dir
         self.collection = collection
         self.collection_dir = os.path.join(base_dir, collection)
         self.index_path = os.path.join(self.collection_dir, '_index.json')
+        self.journal_path = os.path.join(self.collection_dir, '_index.journal')
         self._index: Dict[str, dict] = {}
         self._lock = threading.RLock()
+        # Writers mutate _index in place under the lock and bump _version; readers that
+        # iterate copy it at most once per version, so a write never copies the index
+        self._version = 0
+        self._snapshot: Tuple[int, Dict[str, dict]] = (0, {})
         self._dirty = False
+        self._dirty_count = 0
+        self._pending: List[dict] = []
 
     def load(self) -> None:
         with self._lock:
             if os.path.exists(self.index_path):
                 try:
-                    with file_lock(self.index_path):
-                        with open(self.index_path, 'r') as f:
-                            self._index = json.load(f)
+                    with read_lock(self.index_path):
+                        with open(self.index_path, 'rb') as f:
+                            index = orjson.loads(f.read())
+                        self._replay_journal(index)
+                        self._replace(index)
                     log.info(f"Loaded index for {self.collection}: {len(self._index)} entries")
                 except Exception as e:
                     log.warning(f"Failed to load index for {self.collection}: {e}, rebuilding")
@@ -34,46 +50,87 @@ class StorageIndex:
             else:
                 self._rebuild()
 
+    def _replay_journal(self, index: Dict[str, dict]) -> None:
+        if not os.path.exists(self.journal_path):
+            return
+        replayed = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    log.warning(f"Skipping corrupt journal line for {self.collection}")
+                    continue
+                if record.get('op') == 'set':
+                    index[record['id']] = record['entry']
+                elif record.get('op') == 'delete':
+                    index.pop(record['id'], None)
+                replayed += 1
+        if replayed:
+            self._dirty = True
+            self._dirty_count = replayed
+            log.debug(f"Replayed {replayed} journal entries for {self.collection}")
+
+    def _replace(self, index: Dict[str, dict]) -> None:
+        self._index = index
+        self._version += 1
+
     def _rebuild(self) -> None:
-        self._index = {}
+        self._replace({})
         if not os.path.exists(self.collection_dir):
             os.makedirs(self.collection_dir, exist_ok=True)
+            self._dirty = True
+            self.save()
             return
 
-        for year in os.listdir(self.collection_dir):
-            year_path = os.path.join(self.collection_dir, year)
-            if not os.path.isdir(year_path) or year.startswith('_'):
-                continue
-            for month in os.listdir(year_path):
-                month_path = os.path.join(year_path, month)
-                if not os.path.isdir(month_path):
-                    continue
-                for day in os.listdir(month_path):
-                    day_path = os.path.join(month_path, day)
-                    if not os.path.isdir(day_path):
-                        continue
-                    for filename in os.listdir(day_path):
-                        if filename.endswith('.json'):
-                            file_path = os.path.join(day_path, filename)
-                            self._index_file(file_path)
-
+        index = {}
+        paths = list(self._iter_document_paths())
+        if paths:
+            workers = min(REBUILD_MAX_WORKERS, len(paths))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for result in executor.map(self._read_entry, paths):
+                    if result:
+                        doc_id, entry = result
+                        index[doc_id] = entry
+
+        self._replace(index)
         self._dirty = True
         self.save()
         log.info(f"Rebuilt index for {self.collection}: {len(self._index)} entries")
 
-    def _index_file(self, file_path: str) -> None:
+    @staticmethod
+    def _subdirs(path: str) -> Iterator[os.DirEntry]:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    yield entry
+
+    def _iter_document_paths(self) -> Iterator[str]:
+        for year in self._subdirs(self.collection_dir):
+            if year.name.startswith('_'):
+                continue
+            for month in self._subdirs(year.path):
+                for day in self._subdirs(month.path):
+                    with os.scandir(day.path) as files:
+                        for entry in files:
+                            if entry.name.endswith('.json'):
+                                yield entry.path
+
+    @staticmethod
+    def _read_entry(file_path: str) -> Optional[Tuple[str, dict]]:
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
             doc_id = data.get('id')
             if doc_id:
-                self._index[doc_id] = {
+                return doc_id, {
                     'path': file_path,
                     'created_at': data.get('created_at'),
                     'updated_at': data.get('updated_at')
                 }
         except Exception as e:
             log.warning(f"Failed to index file {file_path}: {e}")
+        return None
 
     def save(self) -> None:
         with self._lock:
@@ -81,45 +138,85 @@ class StorageIndex:
                 return
             os.makedirs(self.collection_dir, exist_ok=True)
             try:
-                with file_lock(self.index_path):
-                    with open(self.index_path, 'w') as f:
-                        json.dump(self._index, f, indent=2)
+                with write_lock(self.index_path):
+                    with open(self.index_path, 'wb') as f:
+                        f.write(orjson.dumps(self._index))
+                    if os.path.exists(self.journal_path):
+                        os.remove(self.journal_path)
                 self._dirty = False
+                self._dirty_count = 0
+                self._pending = []
             except Exception as e:
                 log.error(f"Failed to save index for {self.collection}: {e}")
 
-    def get(self, doc_id: str) -> Optional[str]:
+    def flush(self) -> None:
         with self._lock:
-            entry = self._index.get(doc_id)
-            return entry['path'] if entry else None
+            if self._dirty_count >= self.COMPACT_THRESHOLD:
+                self.save()
+                return
+            if not self._pending:
+                return
+            os.makedirs(self.collection_dir, exist_ok=True)
+            try:
+                with write_lock(self.index_path):
+                    with open(self.journal_path, 'ab') as f:
+                        f.write(b''.join(orjson.dumps(record) + b'\n' for record in self._pending))
+                self._pending = []
+            except Exception as e:
+                log.error(f"Failed to append index journal for {self.collection}: {e}")
+
+    def _record(self, record: dict) -> None:
+        self._pending.append(record)
+        self._dirty = True
+        self._dirty_count += 1
 
-    def set(self, doc_id: str, path: str, created_at: str = None, updated_at: str = None) -> None:
+    def get(self, doc_id: str) -> Optional[str]:
+        entry = self._index.get(doc_id)
+        return entry['path'] if entry else None
+
+    def get_entry(self, doc_id: str) -> Optional[dict]:
+        return self._index.get(doc_id)
+
+    def set(self, doc_id: str, path: str, created_at: str = None, updated_at: str = None,
+            content_hash: str = None) -> None:
+        entry = {
+            'path': path,
+            'created_at': created_at or datetime.utcnow().isoformat(),
+            'updated_at': updated_at or datetime.utcnow().isoformat()
+        }
+        if content_hash:
+            entry['hash'] = content_hash
         with self._lock:
-            self._index[doc_id] = {
-                'path': path,
-                'created_at': created_at or datetime.utcnow().isoformat(),
-                'updated_at': updated_at or datetime.utcnow().isoformat()
-            }
-            self._dirty = True
+            self._index[doc_id] = entry
+            self._version += 1
+            self._record({'op': 'set', 'id': doc_id, 'entry': entry})
 
     def delete(self, doc_id: str) -> bool:
         with self._lock:
-            if doc_id in self._index:
-                del self._index[doc_id]
-                self._dirty = True
+            if self._index.pop(doc_id, None) is not None:
+                self._version += 1
+                self._record({'op': 'delete', 'id': doc_id})
                 return True
             return False
 
+    def _published(self) -> Dict[str, dict]:
+        version, snapshot = self._snapshot
+        if version != self._version:
+            version = self._version
+            snapshot = self._index.copy()
+            self._snapshot = (version, snapshot)
+        return snapshot
+
+    def iter_ids(self) -> Iterator[str]:
+        return iter(self._published())
+
     def all_ids(self) -> list:
-        with self._lock:
-            return list(self._index.keys())
+        return list(self.iter_ids())
 
-    def all_entries(self) -> Dict[str, dict]:
-        with self._lock:
-            return dict(self._index)
+    def all_entries(self) -> Mapping[str, dict]:
+        return MappingProxyType(self._published())
 
     def find_by_field(self, field: str, value: Any) -> list:
-        with self._lock:
-            return [doc_id for doc_id, entry in self._index.items() 
-                    if entry.get(field) == value]
+        return [doc_id for doc_id, entry in self._published().items()
+                if entry.get(field) == value]
 
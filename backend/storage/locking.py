@@ -1,45 +1,127 @@
 import logging
-from contextlib import contextmanager
+import threading
+import time
+import weakref
+from contextlib import contextmanager, ExitStack
 from filelock import FileLock, Timeout
 
+from backend.config import FILE_STORAGE_MULTIPROCESS_LOCKS
+
 log = logging.getLogger('storage.locking')
 
 DEFAULT_LOCK_TIMEOUT = 10
 
 
-@contextmanager
-def file_lock(path: str, timeout: float = DEFAULT_LOCK_TIMEOUT):
-    lock_path = f"{path}.lock"
-    lock = FileLock(lock_path, timeout=timeout)
-    try:
-        lock.acquire()
-        yield
-    except Timeout:
-        log.error(f"Failed to acquire lock for {path} within {timeout}s")
-        raise
-    finally:
-        lock.release()
+class RWLock:
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+
+    def _wait_until(self, predicate, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._cond.wait(remaining)
+        return True
+
+    def acquire_read(self, timeout: float = DEFAULT_LOCK_TIMEOUT) -> bool:
+        with self._cond:
+            if not self._wait_until(lambda: not self._writer, timeout):
+                return False
+            self._readers += 1
+            return True
+
+    def release_read(self) -> None:
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self, timeout: float = DEFAULT_LOCK_TIMEOUT) -> bool:
+        with self._cond:
+            if not self._wait_until(lambda: not self._writer and self._readers == 0, timeout):
+                return False
+            self._writer = True
+            return True
+
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
 
 
 class LockManager:
-    def __init__(self, timeout: float = DEFAULT_LOCK_TIMEOUT):
+    def __init__(self, timeout: float = DEFAULT_LOCK_TIMEOUT, multiprocess: bool = FILE_STORAGE_MULTIPROCESS_LOCKS):
         self.timeout = timeout
-        self._locks = {}
+        self.multiprocess = multiprocess
+        self._locks: "weakref.WeakValueDictionary[str, RWLock]" = weakref.WeakValueDictionary()
+        self._registry_lock = threading.Lock()
 
-    def get_lock(self, path: str) -> FileLock:
-        if path not in self._locks:
-            self._locks[path] = FileLock(f"{path}.lock", timeout=self.timeout)
-        return self._locks[path]
+    def get_lock(self, path: str) -> RWLock:
+        with self._registry_lock:
+            lock = self._locks.get(path)
+            if lock is None:
+                lock = RWLock()
+                self._locks[path] = lock
+            return lock
 
     @contextmanager
-    def lock(self, path: str):
-        lock = self.get_lock(path)
+    def _process_lock(self, path: str, timeout: float):
+        lock = FileLock(f"{path}.lock", timeout=timeout)
         try:
             lock.acquire()
             yield
         except Timeout:
-            log.error(f"Failed to acquire lock for {path}")
+            log.error(f"Failed to acquire file lock for {path} within {timeout}s")
             raise
         finally:
             lock.release()
 
+    @contextmanager
+    def read_lock(self, path: str, timeout: float = None):
+        timeout = self.timeout if timeout is None else timeout
+        lock = self.get_lock(path)
+        if not lock.acquire_read(timeout):
+            log.error(f"Failed to acquire read lock for {path} within {timeout}s")
+            raise Timeout(path)
+        try:
+            with ExitStack() as stack:
+                if self.multiprocess:
+                    stack.enter_context(self._process_lock(path, timeout))
+                yield
+        finally:
+            lock.release_read()
+
+    @contextmanager
+    def write_lock(self, path: str, timeout: float = None):
+        timeout = self.timeout if timeout is None else timeout
+        lock = self.get_lock(path)
+        if not lock.acquire_write(timeout):
+            log.error(f"Failed to acquire write lock for {path} within {timeout}s")
+            raise Timeout(path)
+        try:
+            with ExitStack() as stack:
+                if self.multiprocess:
+                    stack.enter_context(self._process_lock(path, timeout))
+                yield
+        finally:
+            lock.release_write()
+
+    lock = write_lock
+
+
+_lock_manager = LockManager()
+
+
+def read_lock(path: str, timeout: float = DEFAULT_LOCK_TIMEOUT):
+    return _lock_manager.read_lock(path, timeout)
+
+
+def write_lock(path: str, timeout: float = DEFAULT_LOCK_TIMEOUT):
+    return _lock_manager.write_lock(path, timeout)
+
+
+file_lock = write_lock
@@ -4,52 +4,73 @@ import re
 class ContentCleaner:
 
     BOX_CHARS = '─│╭╮╰╯┌┐└┘├┤┬┴┼'
-    BOX_CHARS = '─│╭╮╰╯┌┐└┘├┤┬┴┼'
 
-    @classmethod
-    def clean_assistant_content(cls, content: str) -> str:
-        if not content:
-            return content
-
-        lines = content.split('\n')
-        cleaned_lines = []
-
-        for line in lines:
-            stripped = line.strip()
+    # Terminal UI garbage patterns (escape code remnants, status area artifacts)
+    _GARBAGE_ALTERNATIVES = (
+        r'[;0-9]{1,5}|'              # Escape code number remnants (;38, 255, etc)
+        r'SA|'                        # Scroll/Status Area remnants from Auggie UI
+        r'[A-Z]{1,2}|'                # Single/double uppercase (cursor codes: A, H, K, SA, etc)
+        r'[0-9]+;[0-9]+|'             # Coordinate remnants (row;col)
+        r'm|'                         # SGR terminator remnant
+        r'\?[0-9]+[hl]'               # DEC mode remnants (?25h, ?25l)
+    )
 
-            # Stop at prompt artifacts (marks end of AI response)
-            if cls._is_prompt_line(stripped):
-                break
+    # Lines that could end the response (prompt or path); confirmed by _is_stop_line
+    _STOP_CANDIDATE_RE = re.compile(r'^[^\S\n]*[›│/]', re.MULTILINE)
 
-            # Stop at path-like lines (terminal prompt showing directory)
-            if cls._is_path_line(stripped):
-                break
+    # Whole lines dropped from the response: empty box rows, box-drawing-only rows,
+    # and terminal escape remnants
+    _SKIP_LINE_RE = re.compile(
+        r'^(?:'
+        r'[^\n]*│ {74}│[^\n]*|'
+        rf'[^\S\n]*[{BOX_CHARS}]+[^\S\n]*|'
+        rf'[^\S\n]*(?:{_GARBAGE_ALTERNATIVES})[^\S\n]*'
+        r')(?:\n|$)',
+        re.MULTILINE
+    )
 
-            # Skip empty box lines
-            if cls._is_empty_box_line(line):
-                continue
+    # Trailing ;NN / │NN escape remnants at line end
+    _TRAILING_GARBAGE_RE = re.compile(r'(?:[;0-9]*;|[;0-9]*;[0-9]{2}|(?<=│)[0-9]{2})$', re.MULTILINE)
 
-            # Skip lines that are ONLY box drawing characters
-            if cls._is_box_only_line(stripped):
-                continue
+    # Partial escape sequence remnants that appear mid-line when chunks split
+    # Matches patterns like: [2K, [1A, [?25h, [0m, [38;2;...m etc
+    _PARTIAL_ESCAPE_RE = re.compile(
+        r'\[(?:'
+        r'[0-9;]*[A-Za-z]|'           # CSI sequences: [2K, [1A, [0m, [38;2;255;255;255m
+        r'\?[0-9]+[hl]'               # DEC mode: [?25h, [?25l
+        r')'
+    )
 
-            # Skip garbage escape code remnants
-            if cls._is_garbage_line(stripped):
-                continue
+    _FINAL_REMNANT_RE = re.compile(r';[0-9]+$')
 
-            # Clean partial escape sequences (e.g., [2K, [1A) from mid-line
-            line = cls._clean_partial_escapes(line)
+    @classmethod
+    def clean_assistant_content(cls, content: str) -> str:
+        if not content:
+            return content
 
-            # Clean trailing garbage characters
-            stripped = line.strip()  # Re-strip after escape removal
-            line = cls._clean_trailing_garbage(line, stripped)
-            cleaned_lines.append(line)
+        content = content[:cls._find_stop(content)]
+        content = cls._SKIP_LINE_RE.sub('', content)
+        content = cls._PARTIAL_ESCAPE_RE.sub('', content)
+        content = cls._TRAILING_GARBAGE_RE.sub('', content)
 
-        result = '\n'.join(cleaned_lines).rstrip()
+        result = content.rstrip()
         # Final cleanup: remove trailing semicolons followed by numbers (escape code remnants)
         # Only strip if it looks like escape code garbage: ends with ;NN pattern
-        result = re.sub(r';[0-9]+$', '', result)
-        return result
+        return cls._FINAL_REMNANT_RE.sub('', result)
+
+    @classmethod
+    def _find_stop(cls, content: str) -> int:
+        for match in cls._STOP_CANDIDATE_RE.finditer(content):
+            start = match.start()
+            end = content.find('\n', start)
+            if cls._is_stop_line(content[start:end if end != -1 else len(content)].strip()):
+                return start
+        return len(content)
+
+    @classmethod
+    def _is_stop_line(cls, stripped: str) -> bool:
+        # Prompt artifacts and path-like terminal prompts mark the end of the AI response
+        return cls._is_prompt_line(stripped) or cls._is_path_line(stripped)
 
     @classmethod
     def _is_prompt_line(cls, stripped: str) -> bool:
@@ -82,60 +103,6 @@ class ContentCleaner:
         # Bare path only - likely terminal prompt
         return True
 
-    @classmethod
-    def _is_empty_box_line(cls, line: str) -> bool:
-        return '│                                                                          │' in line
-
-    @classmethod
-    def _is_box_only_line(cls, stripped: str) -> bool:
-        return stripped and all(c in cls.BOX_CHARS for c in stripped)
-
-    # Terminal UI garbage patterns (escape code remnants, status area artifacts)
-    _GARBAGE_PATTERNS = re.compile(
-        r'^(?:'
-        r'[;0-9]{1,5}|'              # Escape code number remnants (;38, 255, etc)
-        r'SA|'                        # Scroll/Status Area remnants from Auggie UI
-        r'[A-Z]{1,2}|'                # Single/double uppercase (cursor codes: A, H, K, SA, etc)
-        r'[0-9]+;[0-9]+|'             # Coordinate remnants (row;col)
-        r'm|'                         # SGR terminator remnant
-        r'\?[0-9]+[hl]'               # DEC mode remnants (?25h, ?25l)
-        r')$'
-    )
-
-    # Partial escape sequence remnants that appear mid-line when chunks split
-    # Matches patterns like: [2K, [1A, [?25h, [0m, [38;2;...m etc
-    _PARTIAL_ESCAPE_RE = re.compile(
-        r'\[(?:'
-        r'[0-9;]*[A-Za-z]|'           # CSI sequences: [2K, [1A, [0m, [38;2;255;255;255m
-        r'\?[0-9]+[hl]'               # DEC mode: [?25h, [?25l
-        r')'
-    )
-
-    @classmethod
-    def _is_garbage_line(cls, stripped: str) -> bool:
-        if not stripped:
-            return False
-        if len(stripped) <= 5 and stripped.lstrip(';').isdigit():
-            return True
-        if cls._GARBAGE_PATTERNS.match(stripped):
-            return True
-        return False
-
-    @classmethod
-    def _clean_partial_escapes(cls, line: str) -> str:
-        return cls._PARTIAL_ESCAPE_RE.sub('', line)
-
-    @classmethod
-    def _clean_trailing_garbage(cls, line: str, stripped: str) -> str:
-        if stripped.endswith(';'):
-            return line.rstrip(';0123456789')
-        if (len(stripped) > 2 and 
-            stripped[-1].isdigit() and 
-            stripped[-2].isdigit() and 
-            stripped[-3] in ';│'):
-            return line.rstrip(';0123456789')
-        return line
-
     @classmethod
     def strip_previous_response(cls, content: str, previous_response: str) -> str:
         if previous_response and content and content.startswith(previous_response):
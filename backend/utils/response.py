@@ -2,7 +2,7 @@ import re
 import logging
 from typing import Optional
 
-from backend.config import SKIP_PATTERNS, BOX_CHARS_PATTERN
+from backend.config import SKIP_PATTERNS, BOX_CHARS, BOX_CHARS_PATTERN
 from backend.utils.text import TextCleaner
 
 log = logging.getLogger('response')
@@ -11,12 +11,6 @@ log = logging.getLogger('response')
 # Response Extraction Patterns
 # =============================================================================
 
-# Control characters (except newline, tab, carriage return) to strip
-_CTRL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
-
-# Section dividers: horizontal lines of 10+ box-drawing dashes
-_SECTION_RE = re.compile(r'─{10,}')
-
 # Status messages that indicate processing state, not actual content
 _STATUS_PATTERNS = frozenset([
     'Sending request',
@@ -25,6 +19,41 @@ _STATUS_PATTERNS = frozenset([
     'Executing tools'
 ])
 
+# Any skip or status substring; one C-level scan instead of per-pattern `in` checks
+_NOISE_LINE_RE = re.compile('|'.join(map(re.escape, [*SKIP_PATTERNS, *_STATUS_PATTERNS])))
+
+
+# First-character classes: '╭'/'╰' open or close UI boxes, '│' starts prompt rows,
+# and any other box character may start a box-only decoration row
+_LEAD_BOX_EDGE, _LEAD_PIPE, _LEAD_BOX = 1, 2, 3
+_LEAD_KIND = {**dict.fromkeys(BOX_CHARS, _LEAD_BOX), '╭': _LEAD_BOX_EDGE, '╰': _LEAD_BOX_EDGE, '│': _LEAD_PIPE}
+
+
+def _is_text_line(s: str) -> bool:
+    lead = _LEAD_KIND.get(s[0])
+    if lead is None:
+        return True
+    if lead == _LEAD_BOX_EDGE:
+        return False
+    if lead == _LEAD_PIPE and ('›' in s or len(s) < 5):
+        return False
+    return not BOX_CHARS_PATTERN.match(s)
+
+
+# One match per line, newline included; callers strip it along with the other whitespace
+_LINE_RE = re.compile(r'[^\n]*\n|[^\n]+')
+
+
+def _is_history_line(s: str, message_lower: str) -> bool:
+    # Matches "<digits>. <message>" case-insensitively, e.g. "1. user's question"
+    end = 0
+    while end < len(s) and s[end].isdecimal():
+        end += 1
+    if not end or s[end:end + 1] != '.':
+        return False
+    rest = s[end + 1:]
+    return rest[:1].isspace() and rest.lstrip().lower() == message_lower
+
 
 class ResponseExtractor:
 
@@ -50,14 +79,17 @@ class ResponseExtractor:
         if continuation_marker is ResponseExtractor._NOT_SET:
             continuation_marker = ResponseExtractor.DEFAULT_CONTINUATION_MARKER
 
-        text = _CTRL_CHARS_RE.sub('', TextCleaner.strip_ansi(raw_output))
+        # Stripping only removes characters, so a single-char marker missing from the raw capture stays missing
+        if response_marker and len(response_marker) == 1 and response_marker not in raw_output:
+            log.debug(f"[EXTRACT] No {response_marker} marker found in output")
+            return ""
+
+        text = TextCleaner.strip_terminal(raw_output)
         full_message = user_message.strip()
 
         # Build pattern to filter exact Auggie message history lines (e.g., "1. user's question")
         # Only filters exact matches to preserve legitimate content like "1. list databases - shows all DBs"
-        msg_history_pattern = None
-        if len(full_message) >= 5:
-            msg_history_pattern = re.compile(r'^\d+\.\s+' + re.escape(full_message) + r'\s*$', re.IGNORECASE)
+        history_message = full_message.lower() if len(full_message) >= 5 else None
 
         # Simple approach: Find the first response marker (●) and extract from there
         # Everything before ● is echo/UI noise, everything after is the response
@@ -66,12 +98,12 @@ class ResponseExtractor:
             log.debug(f"[EXTRACT] No {response_marker} marker found in output")
             return ""
 
-        content_start = text[marker_pos:]
+        marker_prefixes = tuple(m for m in (thinking_marker, response_marker, continuation_marker) if m)
         lines = []
         found = False
 
-        for line in content_start.split('\n'):
-            s = line.strip()
+        for m in _LINE_RE.finditer(text, marker_pos):
+            s = m.group().strip()
             if not s and not lines:
                 continue
 
@@ -82,16 +114,17 @@ class ResponseExtractor:
             if '│ ›' in s and s.endswith('│'):
                 break
 
-            if any(p in s for p in SKIP_PATTERNS):
-                continue
-            if any(p in s for p in _STATUS_PATTERNS):
+            if _NOISE_LINE_RE.search(s):
                 continue
 
             # Skip Auggie message history lines (e.g., "1. user's question")
-            if msg_history_pattern and msg_history_pattern.match(s):
+            if history_message and s and s[0].isdecimal() and _is_history_line(s, history_message):
                 continue
 
-            if thinking_marker and s.startswith(thinking_marker):
+            if not s.startswith(marker_prefixes):
+                if found and s and _is_text_line(s):
+                    lines.append(s)
+            elif thinking_marker and s.startswith(thinking_marker):
                 c = s[len(thinking_marker):].strip()
                 if c:
                     lines.append(f"*{c}*")
@@ -104,13 +137,10 @@ class ResponseExtractor:
                 c = s[len(continuation_marker):].strip()
                 if c:
                     lines.append(f"  ↳ {c}")
-            elif s and s[0] not in '╭╰' and not (s.startswith('│') and ('›' in s or len(s) < 5)) and not BOX_CHARS_PATTERN.match(s):
-                if found:
-                    lines.append(s)
 
         if lines and found:
             result = TextCleaner.clean_response('\n'.join(lines))
-            if len(result.replace('\n', ' ').strip()) < 100 and any(p in result for p in _STATUS_PATTERNS):
+            if len(result) < 100 and any(p in result for p in _STATUS_PATTERNS):
                 return ""
             return result
 
@@ -1,5 +1,6 @@
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 
 # =============================================================================
 # Regex Patterns for Terminal Output Cleaning
@@ -19,53 +20,80 @@ _ANSI_RE = re.compile(
 
 # Extra terminal artifacts: RGB color codes, Braille chars, status messages
 # Matches: 256-color/truecolor codes (38;2;R;G;B), Braille pattern chars, status text
-_EXTRA_RE = re.compile(
-    r'\b\d+;2;\d+(?:;\d+;\d+)?\b|'    # Truecolor: 38;2;R;G;B or 48;2;R;G;B
-    r'[34]8;5;\d+|'                   # 256-color: 38;5;N or 48;5;N
-    r'[\u2800-\u28FF]|'               # Braille pattern characters (⠀-⣿)
-    r'(?:Processing response|Sending request)\.\.\. \([^)]+\)|'  # Status with timing
-    r'\([^)]*esc to interrupt[^)]*\)|'  # Interrupt hint in parens
-    r'[-–—]?\s*esc to interrupt',     # Interrupt hint standalone
-    re.IGNORECASE
+# Each pattern is paired with a casefolded literal it cannot match without, so scans
+# only include the alternatives that can fire on the given text
+_EXTRA_PARTS = (
+    (';2;', r'\b\d+;2;\d+(?:;\d+;\d+)?\b'),        # Truecolor: 38;2;R;G;B or 48;2;R;G;B
+    ('8;5;', r'[34]8;5;\d+'),                       # 256-color: 38;5;N or 48;5;N
+    ('', r'[\u2800-\u28FF]'),                       # Braille pattern characters (⠀-⣿)
+    ('processing response', r'Processing response\.\.\. \([^)]+\)'),  # Status with timing
+    ('sending request', r'Sending request\.\.\. \([^)]+\)'),
+    ('esc to interrupt', r'\([^)]*esc to interrupt[^)]*\)'),  # Interrupt hint in parens
+    ('esc to interrupt', r'[-–—]?\s*esc to interrupt'),       # Interrupt hint standalone
 )
 
+# Stray control characters (except newline, tab, carriage return)
+_CTRL_CHARS = r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]'
+
 # UI elements to remove: box chars, model tags, shortcuts, spinner + status lines
-_CLEAN_RE = re.compile(
-    r'[╭╮╯╰│─╗╔║╚╝═]+|'               # Box drawing characters
-    r'\[Claude.*?\].*?~|'             # Model tag like [Claude 4] ...
-    r'\? to show shortcuts.*|'         # Shortcut hint
-    r'Ctrl\+[A-Z].*|'                  # Keyboard shortcuts
-    r'[⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏].*?Sending request[^\n]*|'  # Spinner + sending status
-    r'[^\n]*esc to interrupt[^\n]*|'   # Lines with interrupt hint
-    r'›\s*$|'                          # Trailing prompt character
-    r'\s*\n\s*›.*$'                    # Lines starting with prompt
+# Paired with the case-sensitive literal each pattern needs, like _EXTRA_PARTS
+_CLEAN_PARTS = (
+    ('', r'[╭╮╯╰│─╗╔║╚╝═]+'),                         # Box drawing characters
+    ('[Claude', r'\[Claude.*?\].*?~'),                # Model tag like [Claude 4] ...
+    ('? to show shortcuts', r'\? to show shortcuts.*'),  # Shortcut hint
+    ('Ctrl+', r'Ctrl\+[A-Z].*'),                      # Keyboard shortcuts
+    ('Sending request', r'[⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏].*?Sending request[^\n]*'),  # Spinner + sending status
+    ('esc to interrupt', r'[^\n]*esc to interrupt[^\n]*'),  # Lines with interrupt hint
+    ('›', r'›\s*$'),                                  # Trailing prompt character
+    ('›', r'\s*\n\s*›.*$'),                            # Lines starting with prompt
 )
 
+
+@lru_cache(maxsize=128)
+def _join_patterns(patterns: Tuple[str, ...], flags: int) -> re.Pattern:
+    return re.compile('|'.join(patterns), flags)
+
+
+def _remove_active(text: str, parts: Tuple[Tuple[str, str], ...], haystack: str, flags: int = 0,
+                   extra: Tuple[str, ...] = ()) -> str:
+    patterns = tuple(pattern for cue, pattern in parts if cue in haystack) + extra
+    return _join_patterns(patterns, flags).sub('', text) if patterns else text
+
+
+def _strip_extra(text: str, with_ctrl: bool) -> str:
+    extra = (_CTRL_CHARS,) if with_ctrl else ()
+    return _remove_active(text, _EXTRA_PARTS, text.casefold(), re.IGNORECASE, extra)
+
+
 # Automation/vim mode hints that shouldn't appear in responses
-_AUTOMATION_RE = re.compile(
-    r'Use vim mode with /vim.*|'
-    r'For automation.*auggie.*|'
-    r'auggie --print.*',
-    re.IGNORECASE
+# Paired with casefolded literals, like _EXTRA_PARTS
+_AUTOMATION_PARTS = (
+    ('use vim mode with /vim', r'Use vim mode with /vim.*'),
+    ('for automation', r'For automation.*auggie.*'),
+    ('auggie --print', r'auggie --print.*'),
 )
 
 # Standalone "Copy" button text from terminal UI
 _COPY_RE = re.compile(r'^\s*Copy\s*$', re.MULTILINE)
 
-# Collapse excessive newlines (3+ → 2)
-_NEWLINES_RE = re.compile(r'\n{3,}')
-
 
 class TextCleaner:
 
     @staticmethod
     def strip_ansi(text: str) -> str:
-        return _EXTRA_RE.sub('', _ANSI_RE.sub('', text))
+        return _strip_extra(_ANSI_RE.sub('', text), with_ctrl=False)
+
+    @staticmethod
+    def strip_terminal(text: str) -> str:
+        return _strip_extra(_ANSI_RE.sub('', text), with_ctrl=True)
 
     @staticmethod
     def clean_response(text: str) -> str:
-        text = _CLEAN_RE.sub('', text)
-        text = _AUTOMATION_RE.sub('', text)
-        text = _COPY_RE.sub('', text)
-        return _NEWLINES_RE.sub('\n\n', text).strip()
+        text = _remove_active(text, _CLEAN_PARTS, text)
+        text = _remove_active(text, _AUTOMATION_PARTS, text.casefold(), re.IGNORECASE)
+        if 'Copy' in text:
+            text = _COPY_RE.sub('', text)
+        while '\n\n\n' in text:
+            text = text.replace('\n\n\n', '\n\n')
+        return text.strip()
 
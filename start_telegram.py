@@ -22,9 +22,6 @@ import sys
 import signal
 import logging
 
-from dotenv import load_dotenv
-load_dotenv()
-
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s [%(name)s] %(levelname)s: %(message)s'
@@ -32,6 +29,9 @@ logging.basicConfig(
 
 
 def main():
+    from dotenv import load_dotenv
+    load_dotenv()
+
     if not os.environ.get('TELEGRAM_BOT_TOKEN'):
         print("❌ Error: Set TELEGRAM_BOT_TOKEN environment variable")
         print("   Get it from: @BotFather on Telegram")
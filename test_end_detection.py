@@ -4,13 +4,42 @@ Test cases for end-of-response detection.
 Tests that responses are captured completely without being cut off mid-sentence.
 """
 
+import orjson
 import requests
-import json
-import time
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 BASE_URL = "http://localhost:5000"
 
+# Each new chat restarts the workspace's single Auggie session, so scenarios
+# must not overlap; this pause lets the previous one settle first
+SCENARIO_PAUSE_SECONDS = 2
+
+# One pooled HTTP session per thread, reused for chat creation and streaming
+_local = threading.local()
+
+
+def _http() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+# Common incomplete word endings (articles, prepositions, etc.)
+INCOMPLETE_ENDINGS = [
+    'the', 'a', 'an', 'to', 'for', 'with', 'in', 'on', 'at',
+    'of', 'by', 'as', 'is', 'are', 'was', 'were', 'be', 'been',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'may', 'might', 'must', 'can', 'this',
+    'that', 'these', 'those', 'my', 'your', 'his', 'her', 'its',
+    'our', 'their', 'and', 'or', 'but', 'if', 'when', 'where',
+    'which', 'who', 'whom', 'whose', 'e.g.', 'i.e.', 'etc',
+]
+INCOMPLETE_ENDING_RE = re.compile(
+    r' (' + '|'.join(map(re.escape, INCOMPLETE_ENDINGS)) + r')\Z', re.IGNORECASE
+)
+
 
 def test_simple_response():
     """Test a simple one-word answer - should not be cut off."""
@@ -112,31 +141,42 @@ def test_longer_response():
     return False
 
 
+def iter_sse_data(response):
+    """Yield the payload of every SSE data line, decoding each record once."""
+    pending = b""
+    for chunk in response.iter_content(chunk_size=None):
+        *records, pending = (pending + chunk).split(b"\n\n")
+        for record in records:
+            for line in record.decode("utf-8").split("\n"):
+                if line.startswith("data: "):
+                    yield line[6:]
+    for line in pending.decode("utf-8").split("\n"):
+        if line.startswith("data: "):
+            yield line[6:]
+
+
 def send_message(message: str, timeout: int = 120) -> str | None:
     """Send a message to the chat API and collect the streamed response."""
     try:
         # Create a new chat
-        chat_response = requests.post(f"{BASE_URL}/api/chats", json={}, timeout=10)
+        chat_response = _http().post(f"{BASE_URL}/api/chats", json={}, timeout=10)
         chat_id = chat_response.json().get('id', 'test-chat')
 
         # Send message via SSE stream (POST request)
-        response = requests.post(
+        with _http().post(
             f"{BASE_URL}/api/chat/stream",
             json={"message": message, "chat_id": chat_id},
             stream=True,
             timeout=timeout
-        )
-        
-        streaming_content = ""
-        final_content = None
+        ) as response:
+            streaming_content = ""
+            final_content = None
 
-        for line in response.iter_lines(decode_unicode=True):
-            if line and line.startswith("data: "):
-                data = line[6:]
+            for data in iter_sse_data(response):
                 if data == "[DONE]":
                     break
                 try:
-                    chunk = json.loads(data)
+                    chunk = orjson.loads(data)
                     event_type = chunk.get("type", "")
 
                     if event_type == "stream":
@@ -152,7 +192,7 @@ def send_message(message: str, timeout: int = 120) -> str | None:
                     elif event_type == "error":
                         print(f"Error: {chunk.get('message', 'Unknown error')}")
                         return None
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     pass
 
         # Return final content or accumulated streaming content
@@ -178,22 +218,10 @@ def check_response_complete(response: str) -> bool:
     
     response = response.strip()
     
-    # Check for common incomplete word endings (articles, prepositions, etc.)
-    incomplete_endings = [
-        ' the', ' a', ' an', ' to', ' for', ' with', ' in', ' on', ' at',
-        ' of', ' by', ' as', ' is', ' are', ' was', ' were', ' be', ' been',
-        ' have', ' has', ' had', ' do', ' does', ' did', ' will', ' would',
-        ' could', ' should', ' may', ' might', ' must', ' can', ' this',
-        ' that', ' these', ' those', ' my', ' your', ' his', ' her', ' its',
-        ' our', ' their', ' and', ' or', ' but', ' if', ' when', ' where',
-        ' which', ' who', ' whom', ' whose', ' e.g.', ' i.e.', ' etc',
-    ]
-    
-    response_lower = response.lower()
-    for ending in incomplete_endings:
-        if response_lower.endswith(ending):
-            print(f"  WARNING: Response ends with incomplete word: '{ending.strip()}'")
-            return False
+    incomplete = INCOMPLETE_ENDING_RE.search(response)
+    if incomplete:
+        print(f"  WARNING: Response ends with incomplete word: '{incomplete.group(1).lower()}'")
+        return False
     
     # Check for proper sentence ending punctuation
     proper_endings = ['.', '!', '?', ':', ')', ']', '"', "'", '`']
@@ -208,15 +236,25 @@ def check_response_complete(response: str) -> bool:
     return True
 
 
-def run_all_tests():
-    """Run all test cases."""
+def run_test(name: str, test_func) -> bool:
+    try:
+        return test_func()
+    except Exception as e:
+        print(f"Test {name} failed with error: {e}")
+        return False
+
+
+def run_all_tests(max_workers: int = 1):
+    """Run all test cases, one at a time unless max_workers is raised.
+
+    Concurrent runs only make sense against separate workspaces: every new chat
+    force-restarts the workspace's Auggie session, cutting off any scenario
+    still streaming on it.
+    """
     print("\n" + "#"*60)
     print("# END-OF-RESPONSE DETECTION TEST SUITE")
     print("#"*60)
     
-    results = []
-    
-    # Run each test with a small delay between
     tests = [
         ("Simple Response", test_simple_response),
         ("Sentence Response", test_sentence_response),
@@ -225,14 +263,16 @@ def run_all_tests():
         ("Longer Response", test_longer_response),
     ]
     
-    for name, test_func in tests:
-        try:
-            result = test_func()
-            results.append((name, result))
-        except Exception as e:
-            print(f"Test {name} failed with error: {e}")
-            results.append((name, False))
-        time.sleep(2)  # Small delay between tests
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = executor.map(lambda test: run_test(*test), tests)
+            results = [(name, result) for (name, _), result in zip(tests, outcomes)]
+    else:
+        results = []
+        for i, (name, test_func) in enumerate(tests):
+            if i:
+                time.sleep(SCENARIO_PAUSE_SECONDS)
+            results.append((name, run_test(name, test_func)))
     
     # Summary
     print("\n" + "="*60)
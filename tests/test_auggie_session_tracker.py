@@ -1,249 +1,191 @@
 import pytest
 import os
 import json
-import tempfile
+import orjson
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
 
+from backend.services.auggie import session_tracker
+from backend.services.auggie.session_tracker import (
+    session_exists, get_latest_session_for_workspace, get_session_workspace
+)
+
+
+def _session_data(session_id, workspace):
+    return {
+        "sessionId": session_id,
+        "chatHistory": [{
+            "exchange": {
+                "request_nodes": [{
+                    "type": 4,
+                    "ide_state_node": {
+                        "workspace_folders": [{"folder_root": workspace}]
+                    }
+                }]
+            }
+        }]
+    }
+
+
+def _write_session(sessions_dir, session_id, workspace):
+    session_file = os.path.join(sessions_dir, f"{session_id}.json")
+    with open(session_file, 'w') as f:
+        json.dump(_session_data(session_id, workspace), f)
+    return session_file
+
+
+@pytest.fixture
+def sessions_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', str(tmp_path))
+    return str(tmp_path)
+
 
 class TestSessionExists:
 
-    def test_session_exists_true(self):
-        from backend.services.auggie.session_tracker import session_exists
-        
-        with tempfile.TemporaryDirectory() as tmpdir:
-            session_id = "test-session-123"
-            session_file = os.path.join(tmpdir, f"{session_id}.json")
-            with open(session_file, 'w') as f:
-                json.dump({"sessionId": session_id}, f)
-            
-            with patch('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', tmpdir):
-                assert session_exists(session_id) is True
-
-    def test_session_exists_false(self):
-        from backend.services.auggie.session_tracker import session_exists
-        
-        with tempfile.TemporaryDirectory() as tmpdir:
-            with patch('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', tmpdir):
-                assert session_exists("nonexistent-session") is False
+    def test_session_exists_true(self, sessions_dir):
+        session_id = "test-session-123"
+        with open(os.path.join(sessions_dir, f"{session_id}.json"), 'w') as f:
+            json.dump({"sessionId": session_id}, f)
+
+        assert session_exists(session_id) is True
+
+    def test_session_exists_false(self, sessions_dir):
+        assert session_exists("nonexistent-session") is False
 
     def test_session_exists_empty_id(self):
-        from backend.services.auggie.session_tracker import session_exists
-        
         assert session_exists("") is False
         assert session_exists(None) is False
 
 
 class TestGetLatestSessionForWorkspace:
 
-    def test_finds_session_for_workspace(self):
-        from backend.services.auggie.session_tracker import get_latest_session_for_workspace
-        
-        with tempfile.TemporaryDirectory() as tmpdir:
-            workspace = "/home/user/project"
-            session_id = "abc-123-def"
-            
-            session_data = {
-                "sessionId": session_id,
-                "chatHistory": [{
-                    "exchange": {
-                        "request_nodes": [{
-                            "type": 4,
-                            "ide_state_node": {
-                                "workspace_folders": [{"folder_root": workspace}]
-                            }
-                        }]
-                    }
-                }]
-            }
-            
-            session_file = os.path.join(tmpdir, f"{session_id}.json")
-            with open(session_file, 'w') as f:
-                json.dump(session_data, f)
-            
-            with patch('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', tmpdir):
-                result = get_latest_session_for_workspace(workspace)
-                assert result == session_id
-
-    def test_no_session_for_workspace(self):
-        from backend.services.auggie.session_tracker import get_latest_session_for_workspace
-        
-        with tempfile.TemporaryDirectory() as tmpdir:
-            workspace = "/home/user/other-project"
-            session_data = {
-                "sessionId": "xyz-789",
-                "chatHistory": [{
-                    "exchange": {
-                        "request_nodes": [{
-                            "type": 4,
-                            "ide_state_node": {
-                                "workspace_folders": [{"folder_root": "/different/path"}]
-                            }
-                        }]
-                    }
-                }]
-            }
-            
-            session_file = os.path.join(tmpdir, "xyz-789.json")
-            with open(session_file, 'w') as f:
-                json.dump(session_data, f)
-            
-            with patch('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', tmpdir):
-                result = get_latest_session_for_workspace(workspace)
-                assert result is None
-
-    def test_returns_most_recent_session(self):
-        from backend.services.auggie.session_tracker import get_latest_session_for_workspace
-        import time
-        
-        with tempfile.TemporaryDirectory() as tmpdir:
-            workspace = "/home/user/project"
-            
-            for i, session_id in enumerate(["old-session", "new-session"]):
-                session_data = {
-                    "sessionId": session_id,
-                    "chatHistory": [{
-                        "exchange": {
-                            "request_nodes": [{
-                                "type": 4,
-                                "ide_state_node": {
-                                    "workspace_folders": [{"folder_root": workspace}]
-                                }
-                            }]
-                        }
-                    }]
-                }
-                
-                session_file = os.path.join(tmpdir, f"{session_id}.json")
-                with open(session_file, 'w') as f:
-                    json.dump(session_data, f)
-                time.sleep(0.05)
-            
-            with patch('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', tmpdir):
-                result = get_latest_session_for_workspace(workspace)
-                assert result == "new-session"
-
-    def test_filters_by_after_time(self):
-        from backend.services.auggie.session_tracker import get_latest_session_for_workspace
-        import time
-        
-        with tempfile.TemporaryDirectory() as tmpdir:
-            workspace = "/home/user/project"
-            session_data = {
-                "sessionId": "old-session",
-                "chatHistory": [{
-                    "exchange": {
-                        "request_nodes": [{
-                            "type": 4,
-                            "ide_state_node": {
-                                "workspace_folders": [{"folder_root": workspace}]
-                            }
-                        }]
-                    }
-                }]
-            }
-            
-            session_file = os.path.join(tmpdir, "old-session.json")
-            with open(session_file, 'w') as f:
-                json.dump(session_data, f)
-            
-            after_time = datetime.now() + timedelta(seconds=10)
-
-            with patch('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', tmpdir):
-                result = get_latest_session_for_workspace(workspace, after_time)
-                assert result is None
-
-    def test_handles_missing_directory(self):
-        from backend.services.auggie.session_tracker import get_latest_session_for_workspace
-
-        with patch('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', '/nonexistent/path'):
-            result = get_latest_session_for_workspace("/home/user/project")
-            assert result is None
-
-    def test_handles_malformed_json(self):
-        from backend.services.auggie.session_tracker import get_latest_session_for_workspace
-
-        with tempfile.TemporaryDirectory() as tmpdir:
-            session_file = os.path.join(tmpdir, "bad-session.json")
-            with open(session_file, 'w') as f:
-                f.write("not valid json {{{")
-
-            with patch('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', tmpdir):
-                result = get_latest_session_for_workspace("/home/user/project")
-                assert result is None
-
-    def test_normalizes_workspace_paths(self):
-        from backend.services.auggie.session_tracker import get_latest_session_for_workspace
-
-        with tempfile.TemporaryDirectory() as tmpdir:
-            session_data = {
-                "sessionId": "session-123",
-                "chatHistory": [{
-                    "exchange": {
-                        "request_nodes": [{
-                            "type": 4,
-                            "ide_state_node": {
-                                "workspace_folders": [{"folder_root": "/home/user/project/"}]
-                            }
-                        }]
-                    }
-                }]
-            }
+    def test_finds_session_for_workspace(self, sessions_dir):
+        workspace = "/home/user/project"
+        _write_session(sessions_dir, "abc-123-def", workspace)
+
+        assert get_latest_session_for_workspace(workspace) == "abc-123-def"
+
+    def test_no_session_for_workspace(self, sessions_dir):
+        _write_session(sessions_dir, "xyz-789", "/different/path")
 
-            session_file = os.path.join(tmpdir, "session-123.json")
-            with open(session_file, 'w') as f:
-                json.dump(session_data, f)
+        assert get_latest_session_for_workspace("/home/user/other-project") is None
 
-            with patch('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', tmpdir):
-                result = get_latest_session_for_workspace("/home/user/project")
-                assert result == "session-123"
+    def test_returns_most_recent_session(self, sessions_dir):
+        workspace = "/home/user/project"
+        base_ts = datetime.now().timestamp() - 10
+        for i, session_id in enumerate(["old-session", "new-session"]):
+            session_file = _write_session(sessions_dir, session_id, workspace)
+            os.utime(session_file, (base_ts + i, base_ts + i))
+
+        assert get_latest_session_for_workspace(workspace) == "new-session"
+
+    def test_stops_at_newest_match(self, sessions_dir):
+        workspace = "/home/user/project"
+        base_ts = datetime.now().timestamp() - 100
+        for i, session_id in enumerate(["older-a", "older-b", "newest"]):
+            session_file = _write_session(sessions_dir, session_id, workspace)
+            os.utime(session_file, (base_ts + i, base_ts + i))
+
+        with patch('backend.services.auggie.session_tracker.orjson.loads', wraps=orjson.loads) as load:
+            assert get_latest_session_for_workspace(workspace) == "newest"
+            assert load.call_count == 1
+
+    def test_scans_many_sessions_concurrently(self, sessions_dir, monkeypatch):
+        monkeypatch.setattr('backend.services.auggie.session_tracker.CONCURRENT_SCAN_MIN', 4)
+        workspace = "/home/user/project"
+        base_ts = datetime.now().timestamp() - 100
+        for i in range(20):
+            session_file = _write_session(sessions_dir, f"other-{i}", f"/other/{i}")
+            os.utime(session_file, (base_ts + i + 1, base_ts + i + 1))
+        session_file = _write_session(sessions_dir, "target", workspace)
+        os.utime(session_file, (base_ts, base_ts))
+
+        assert get_latest_session_for_workspace(workspace) == "target"
+        assert get_latest_session_for_workspace("/other/7") == "other-7"
+
+    def test_cached_scan_skips_pool(self, sessions_dir, monkeypatch):
+        monkeypatch.setattr('backend.services.auggie.session_tracker.CONCURRENT_SCAN_MIN', 4)
+        for i in range(10):
+            _write_session(sessions_dir, f"other-{i}", f"/other/{i}")
+        get_latest_session_for_workspace("/home/user/project")
+
+        with patch.object(session_tracker._scan_executor, 'map') as pool_map, \
+                patch('backend.services.auggie.session_tracker.orjson.loads') as load:
+            assert get_latest_session_for_workspace("/other/3") == "other-3"
+            assert get_latest_session_for_workspace("/home/user/project") is None
+            pool_map.assert_not_called()
+            load.assert_not_called()
+
+    def test_newer_uncached_match_wins_over_cached(self, sessions_dir):
+        workspace = "/home/user/project"
+        base_ts = datetime.now().timestamp() - 100
+        session_file = _write_session(sessions_dir, "cached", workspace)
+        os.utime(session_file, (base_ts, base_ts))
+        assert get_latest_session_for_workspace(workspace) == "cached"
+
+        session_file = _write_session(sessions_dir, "fresh", workspace)
+        os.utime(session_file, (base_ts + 1, base_ts + 1))
+        assert get_latest_session_for_workspace(workspace) == "fresh"
+
+    def test_scan_drops_cache_entries_for_removed_files(self, sessions_dir):
+        stale = _write_session(sessions_dir, "removed", "/home/user/project")
+        get_latest_session_for_workspace("/home/user/project")
+        assert stale in session_tracker._session_cache
+
+        os.remove(stale)
+        get_latest_session_for_workspace("/home/user/project")
+        assert stale not in session_tracker._session_cache
+
+    def test_filters_by_after_time(self, sessions_dir):
+        workspace = "/home/user/project"
+        _write_session(sessions_dir, "old-session", workspace)
+        after_time = datetime.now() + timedelta(seconds=10)
+
+        assert get_latest_session_for_workspace(workspace, after_time) is None
+
+    def test_handles_missing_directory(self, monkeypatch):
+        monkeypatch.setattr('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', '/nonexistent/path')
+        assert get_latest_session_for_workspace("/home/user/project") is None
+
+    def test_handles_malformed_json(self, sessions_dir):
+        with open(os.path.join(sessions_dir, "bad-session.json"), 'w') as f:
+            f.write("not valid json {{{")
+
+        assert get_latest_session_for_workspace("/home/user/project") is None
+
+    def test_normalizes_workspace_paths(self, sessions_dir):
+        _write_session(sessions_dir, "session-123", "/home/user/project/")
+
+        assert get_latest_session_for_workspace("/home/user/project") == "session-123"
 
 
 class TestGetSessionWorkspace:
 
-    def test_gets_workspace_from_session(self):
-        from backend.services.auggie.session_tracker import get_session_workspace
-
-        with tempfile.TemporaryDirectory() as tmpdir:
-            workspace = "/home/user/myproject"
-            session_id = "session-456"
-            session_data = {
-                "sessionId": session_id,
-                "chatHistory": [{
-                    "exchange": {
-                        "request_nodes": [{
-                            "type": 4,
-                            "ide_state_node": {
-                                "workspace_folders": [{"folder_root": workspace}]
-                            }
-                        }]
-                    }
-                }]
-            }
+    def test_gets_workspace_from_session(self, sessions_dir):
+        workspace = "/home/user/myproject"
+        _write_session(sessions_dir, "session-456", workspace)
 
-            session_file = os.path.join(tmpdir, f"{session_id}.json")
-            with open(session_file, 'w') as f:
-                json.dump(session_data, f)
+        assert get_session_workspace("session-456") == workspace
 
-            with patch('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', tmpdir):
-                result = get_session_workspace(session_id)
-                assert result == workspace
+    def test_reuses_parse_until_file_changes(self, sessions_dir):
+        _write_session(sessions_dir, "session-789", "/home/user/first")
 
-    def test_returns_none_for_missing_session(self):
-        from backend.services.auggie.session_tracker import get_session_workspace
+        with patch('backend.services.auggie.session_tracker.orjson.loads', wraps=orjson.loads) as load:
+            assert get_session_workspace("session-789") == "/home/user/first"
+            assert get_session_workspace("session-789") == "/home/user/first"
+            assert load.call_count == 1
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            with patch('backend.services.auggie.session_tracker.AUGMENT_SESSIONS_DIR', tmpdir):
-                result = get_session_workspace("nonexistent")
-                assert result is None
+            _write_session(sessions_dir, "session-789", "/home/user/second-project")
+            assert get_session_workspace("session-789") == "/home/user/second-project"
+            assert load.call_count == 2
 
-    def test_returns_none_for_empty_id(self):
-        from backend.services.auggie.session_tracker import get_session_workspace
+    def test_returns_none_for_missing_session(self, sessions_dir):
+        assert get_session_workspace("nonexistent") is None
 
+    def test_returns_none_for_empty_id(self):
         assert get_session_workspace("") is None
         assert get_session_workspace(None) is None
 
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
-
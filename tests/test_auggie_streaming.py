@@ -12,10 +12,13 @@ Run with: python -m pytest tests/test_auggie_streaming.py -v -s
 """
 
 import os
+import re
 import sys
 import time
 import json
+import codecs
 import logging
+import selectors
 from dataclasses import dataclass, field
 from typing import List, Optional
 from datetime import datetime
@@ -37,6 +40,8 @@ logging.basicConfig(
 )
 log = logging.getLogger('test.auggie')
 
+_TOOL_RE = re.compile(r'Terminal -|Codebase [Ss]earch|Read File|Web Search')
+
 
 @dataclass
 class StreamTestResult:
@@ -51,7 +56,10 @@ class StreamTestResult:
     raw_output: str = ''
     errors: List[str] = field(default_factory=list)
     tool_blocks_detected: List[str] = field(default_factory=list)
-    streaming_events: List[dict] = field(default_factory=list)
+    # Per-chunk streaming events, one parallel entry per chunk
+    event_times: List[float] = field(default_factory=list)
+    event_chunk_sizes: List[int] = field(default_factory=list)
+    event_total_sizes: List[int] = field(default_factory=list)
 
     def summary(self) -> str:
         """Generate test result summary."""
@@ -117,7 +125,8 @@ class AuggieStreamTester:
     def run_streaming_test(self, question: str, timeout: float = 300.0) -> StreamTestResult:
         """Run a single streaming test."""
         result = StreamTestResult(question=question, success=False, total_time=0)
-        start_time = time.time()
+        start_time = time.monotonic()
+        deadline = start_time + timeout
 
         log.info(f"\n{'='*60}")
         log.info(f"TEST: {question[:80]}...")
@@ -127,6 +136,7 @@ class AuggieStreamTester:
             result.errors.append("Session not alive")
             return result
 
+        selector = selectors.DefaultSelector()
         try:
             # Drain any pending output
             self.session.drain_output(timeout=0.5)
@@ -143,39 +153,43 @@ class AuggieStreamTester:
             processor = StreamProcessor(sanitized)
             state = StreamState(prev_response=self.session.last_response or "")
 
-            import select
             fd = self.session.master_fd
-            last_data_time = time.time()
+            selector.register(fd, selectors.EVENT_READ)
+            # Keeps a multi-byte character split across two reads intact
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+            now = last_data_time = time.monotonic()
             first_chunk_received = False
             chunk_count = 0
+            prev_clean = None
 
             # Main streaming loop
-            while time.time() - start_time < timeout:
-                ready = select.select([fd], [], [], 0.1)[0]
+            while now < deadline:
+                ready = selector.select(timeout=0.1)
+                now = time.monotonic()
 
                 if ready:
                     try:
-                        chunk = os.read(fd, 8192).decode('utf-8', errors='ignore')
+                        chunk = decoder.decode(os.read(fd, 8192))
                         if chunk:
                             chunk_count += 1
                             result.total_bytes += len(chunk)
                             state.all_output += chunk
-                            last_data_time = time.time()
+                            last_data_time = now
 
                             if not first_chunk_received:
-                                result.first_chunk_time = time.time() - start_time
+                                result.first_chunk_time = now - start_time
                                 first_chunk_received = True
                                 log.info(f"First chunk received at {result.first_chunk_time:.2f}s")
 
                             # Log streaming event
-                            result.streaming_events.append({
-                                'time': time.time() - start_time,
-                                'chunk_size': len(chunk),
-                                'total_output_size': len(state.all_output)
-                            })
+                            result.event_times.append(now - start_time)
+                            result.event_chunk_sizes.append(len(chunk))
+                            result.event_total_sizes.append(len(state.all_output))
 
-                            # Process content
+                            # Process content; ANSI-only chunks leave it unchanged
                             clean = TextCleaner.strip_ansi(state.all_output)
+                            clean_changed = clean != prev_clean
+                            prev_clean = clean
 
                             # Check for message echo
                             if not state.saw_message_echo:
@@ -186,14 +200,14 @@ class AuggieStreamTester:
 
                             # Extract content
                             if state.saw_message_echo:
-                                content = processor.process_chunk(clean, state)
+                                content = processor.process_chunk(clean, state) if clean_changed else None
                                 if content:
                                     result.final_content = content
                                     result.total_chunks = chunk_count
 
                                     # Detect tool blocks
                                     for line in content.split('\n'):
-                                        if any(tool in line for tool in ['Terminal -', 'Codebase Search', 'Codebase search', 'Read File', 'Web Search']):
+                                        if _TOOL_RE.search(line):
                                             if line not in result.tool_blocks_detected:
                                                 result.tool_blocks_detected.append(line[:100])
                                                 log.info(f"Tool detected: {line[:60]}")
@@ -206,7 +220,7 @@ class AuggieStreamTester:
                         result.errors.append(f"Read error: {e}")
 
                 # Check silence timeout - only log once per second
-                silence = time.time() - last_data_time
+                silence = now - last_data_time
                 if silence > 5.0 and state.saw_response_marker:
                     # For simple short responses, we can use shorter silence
                     content_length = len(result.final_content) if result.final_content else 0
@@ -242,7 +256,7 @@ class AuggieStreamTester:
                         result.errors.append("Extended silence timeout")
                         break
 
-            result.total_time = time.time() - start_time
+            result.total_time = time.monotonic() - start_time
             result.raw_output = state.all_output
             result.success = len(result.final_content) > 0 and len(result.errors) == 0
 
@@ -254,8 +268,10 @@ class AuggieStreamTester:
 
         except Exception as e:
             result.errors.append(f"Exception: {e}")
-            result.total_time = time.time() - start_time
+            result.total_time = time.monotonic() - start_time
             log.error(f"Test failed with exception: {e}")
+        finally:
+            selector.close()
 
         self.results.append(result)
         return result
@@ -402,37 +418,21 @@ try:
 except ImportError:
     PYTEST_AVAILABLE = False
 
-# Global tester instance for pytest
-_tester: Optional[AuggieStreamTester] = None
-
-
-def _get_tester():
-    """Get or create tester instance."""
-    global _tester
-    if _tester is None:
-        _tester = AuggieStreamTester()
-        if not _tester.setup():
-            return None
-    return _tester
-
-
 if PYTEST_AVAILABLE:
-    @pytest.fixture(scope="module")
-    def tester():
-        """Pytest fixture for AuggieStreamTester."""
-        t = _get_tester()
-        if t is None:
+    @pytest.fixture(scope="session")
+    def tester(request):
+        """Pytest fixture for AuggieStreamTester, shared by the whole run."""
+        t = AuggieStreamTester()
+        request.addfinalizer(t.teardown)
+        if not t.setup():
             pytest.skip("Failed to initialize Auggie session")
-        yield t
-        # Don't teardown between tests - reuse session
+        return t
 
 
 @pytest.mark.slow
 @pytest.mark.integration
-def test_simple_question(tester=None):
+def test_simple_question(tester):
     """Test simple arithmetic question - fast response expected."""
-    if tester is None:
-        tester = _get_tester()
     result = tester.run_streaming_test("What is 2 + 2?")
     print(result.summary())
     assert result.success, f"Test failed: {result.errors}"
@@ -442,10 +442,8 @@ def test_simple_question(tester=None):
 
 @pytest.mark.slow
 @pytest.mark.integration
-def test_codebase_search(tester=None):
+def test_codebase_search(tester):
     """Test codebase search functionality."""
-    if tester is None:
-        tester = _get_tester()
     result = tester.run_streaming_test(
         "Find where the function formatMessage is defined in this codebase"
     )
@@ -456,10 +454,8 @@ def test_codebase_search(tester=None):
 
 @pytest.mark.slow
 @pytest.mark.integration
-def test_terminal_command(tester=None):
+def test_terminal_command(tester):
     """Test terminal command execution."""
-    if tester is None:
-        tester = _get_tester()
     result = tester.run_streaming_test("Run 'ls backend/' and list the files")
     print(result.summary())
     assert result.success, f"Test failed: {result.errors}"
@@ -470,10 +466,8 @@ def test_terminal_command(tester=None):
 
 @pytest.mark.slow
 @pytest.mark.integration
-def test_long_response(tester=None):
+def test_long_response(tester):
     """Test that long responses stream completely without cutoff."""
-    if tester is None:
-        tester = _get_tester()
     result = tester.run_streaming_test(
         "Explain the complete architecture of this chat application. "
         "Include backend structure, frontend, PTY handling, and database. Be thorough."
@@ -488,10 +482,8 @@ def test_long_response(tester=None):
 
 @pytest.mark.slow
 @pytest.mark.integration
-def test_complex_multi_tool(tester=None):
+def test_complex_multi_tool(tester):
     """Test complex query requiring multiple tool uses."""
-    if tester is None:
-        tester = _get_tester()
     result = tester.run_streaming_test(
         "Search the codebase and explain: 1) How PTY sessions work 2) What timeouts exist 3) How streaming works"
     )
@@ -502,10 +494,8 @@ def test_complex_multi_tool(tester=None):
 
 @pytest.mark.slow
 @pytest.mark.integration
-def test_streaming_timing(tester=None):
+def test_streaming_timing(tester):
     """Test that streaming starts promptly."""
-    if tester is None:
-        tester = _get_tester()
     result = tester.run_streaming_test("Say hello and introduce yourself briefly")
     print(result.summary())
     assert result.success, f"Test failed: {result.errors}"
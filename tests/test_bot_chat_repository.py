@@ -1,59 +1,57 @@
 import pytest
 import sys
 import os
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+_FROZEN_ISO = "2025-01-01T00:00:00"
 
-class TestBotChatRepositoryInit:
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_init_db_available(self, mock_cached, mock_collection_fn):
+@pytest.fixture(autouse=True, scope="class")
+def mocks(request):
+    with patch('backend.services.bots.base_repository.get_bot_chats_collection') as col_fn, \
+            patch('backend.services.base_repository.is_db_available_cached') as cached:
         from backend.services.bots.slack.bot_chat_repository import BotChatRepository
+        request.cls.mocks = SimpleNamespace(cached=cached, col_fn=col_fn, Repository=BotChatRepository)
+        yield
+
 
-        mock_cached.return_value = True
+class TestBotChatRepositoryInit:
+
+    def test_init_db_available(self):
+        self.mocks.cached.return_value = True
         mock_col = MagicMock()
-        mock_collection_fn.return_value = mock_col
-        repo = BotChatRepository()
+        self.mocks.col_fn.return_value = mock_col
+        repo = self.mocks.Repository()
         assert repo._db_available is None or repo._db_available is True
 
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_init_db_not_available(self, mock_cached):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = False
-        repo = BotChatRepository()
+    def test_init_db_not_available(self):
+        self.mocks.cached.return_value = False
+        repo = self.mocks.Repository()
         assert repo._db_available is False
 
 
 class TestMakeLookupKey:
 
     def test_lookup_key_without_thread(self):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        repo = BotChatRepository()
+        repo = self.mocks.Repository()
         key = repo._make_lookup_key("U123", "C456")
         assert key == "slack:U123:C456"
 
     def test_lookup_key_with_thread(self):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        repo = BotChatRepository()
+        repo = self.mocks.Repository()
         key = repo._make_lookup_key("U123", "C456", "1234567890.123")
         assert key == "slack:U123:C456:1234567890.123"
 
 
 class TestGetOrCreateChat:
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_get_existing_chat(self, mock_cached, mock_collection_fn):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
+    def test_get_existing_chat(self):
         from datetime import datetime, timedelta
 
-        mock_cached.return_value = True
+        self.mocks.cached.return_value = True
         mock_col = MagicMock()
         recent_time = (datetime.utcnow() - timedelta(minutes=5)).isoformat()
         mock_col.find_one_and_update.return_value = {
@@ -65,9 +63,9 @@ class TestGetOrCreateChat:
             'created_at': recent_time,
             'updated_at': recent_time  # Used by _is_session_expired
         }
-        mock_collection_fn.return_value = mock_col
+        self.mocks.col_fn.return_value = mock_col
 
-        repo = BotChatRepository()
+        repo = self.mocks.Repository()
         ctx = repo.get_or_create_chat("U123", "C456")
 
         assert ctx is not None
@@ -77,26 +75,20 @@ class TestGetOrCreateChat:
         assert ctx.auggie_session_id == 'session-xyz'
         mock_col.find_one_and_update.assert_called_once()
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_create_new_chat(self, mock_cached, mock_collection_fn):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-        from datetime import datetime
-
-        mock_cached.return_value = True
+    def test_create_new_chat(self):
+        self.mocks.cached.return_value = True
         mock_col = MagicMock()
-        now = datetime.utcnow().isoformat()
         mock_col.find_one_and_update.return_value = {
             'id': 'new-chat',
             'lookup_key': 'U123:C456:1234567890.123',
             'user_id': 'U123',
             'channel_id': 'C456',
             'thread_ts': '1234567890.123',
-            'created_at': now
+            'created_at': _FROZEN_ISO
         }
-        mock_collection_fn.return_value = mock_col
+        self.mocks.col_fn.return_value = mock_col
 
-        repo = BotChatRepository()
+        repo = self.mocks.Repository()
         ctx = repo.get_or_create_chat("U123", "C456", "1234567890.123")
 
         assert ctx is not None
@@ -107,12 +99,9 @@ class TestGetOrCreateChat:
         call_kwargs = mock_col.find_one_and_update.call_args[1]
         assert call_kwargs['upsert'] is True
 
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_get_or_create_db_unavailable_uses_memory(self, mock_cached):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = False
-        repo = BotChatRepository()
+    def test_get_or_create_db_unavailable_uses_memory(self):
+        self.mocks.cached.return_value = False
+        repo = self.mocks.Repository()
         ctx = repo.get_or_create_chat("U123", "C456")
 
         # Now returns in-memory context instead of None
@@ -123,19 +112,15 @@ class TestGetOrCreateChat:
 
 class TestSaveMessage:
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_save_message_success(self, mock_cached, mock_collection_fn):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = True
+    def test_save_message_success(self):
+        self.mocks.cached.return_value = True
         mock_col = MagicMock()
         mock_result = MagicMock()
         mock_result.matched_count = 1
         mock_col.update_one.return_value = mock_result
-        mock_collection_fn.return_value = mock_col
+        self.mocks.col_fn.return_value = mock_col
 
-        repo = BotChatRepository()
+        repo = self.mocks.Repository()
         result = repo.save_message("abc123", "What is Python?", "Python is a language.", 5.2)
 
         assert result is True
@@ -146,48 +131,37 @@ class TestSaveMessage:
         assert first_call_args['$push']['messages']['answer'] == "Python is a language."
         assert first_call_args['$push']['messages']['execution_time'] == 5.2
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_save_message_updates_title(self, mock_cached, mock_collection_fn):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = True
+    def test_save_message_updates_title(self):
+        self.mocks.cached.return_value = True
         mock_col = MagicMock()
         mock_result = MagicMock()
         mock_result.matched_count = 1
         mock_col.update_one.return_value = mock_result
-        mock_collection_fn.return_value = mock_col
+        self.mocks.col_fn.return_value = mock_col
 
-        repo = BotChatRepository()
+        repo = self.mocks.Repository()
         repo.save_message("abc123", "What is Python?", "Answer", 1.0)
 
         second_call = mock_col.update_one.call_args_list[1]
         assert second_call[0][0] == {'id': 'abc123', 'title': 'Slack Chat'}
         assert second_call[0][1]['$set']['title'] == "What is Python?"
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_save_message_chat_not_found(self, mock_cached, mock_collection_fn):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = True
+    def test_save_message_chat_not_found(self):
+        self.mocks.cached.return_value = True
         mock_col = MagicMock()
         mock_result = MagicMock()
         mock_result.matched_count = 0
         mock_col.update_one.return_value = mock_result
-        mock_collection_fn.return_value = mock_col
+        self.mocks.col_fn.return_value = mock_col
 
-        repo = BotChatRepository()
+        repo = self.mocks.Repository()
         result = repo.save_message("nonexistent", "Question", "Answer", 1.0)
 
         assert result is False
 
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_save_message_db_unavailable(self, mock_cached):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = False
-        repo = BotChatRepository()
+    def test_save_message_db_unavailable(self):
+        self.mocks.cached.return_value = False
+        repo = self.mocks.Repository()
         result = repo.save_message("abc123", "Question", "Answer", 1.0)
 
         assert result is False
@@ -195,16 +169,12 @@ class TestSaveMessage:
 
 class TestAuggieSessionId:
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_save_auggie_session_id_success(self, mock_cached, mock_collection_fn):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = True
+    def test_save_auggie_session_id_success(self):
+        self.mocks.cached.return_value = True
         mock_col = MagicMock()
-        mock_collection_fn.return_value = mock_col
+        self.mocks.col_fn.return_value = mock_col
 
-        repo = BotChatRepository()
+        repo = self.mocks.Repository()
         result = repo.save_auggie_session_id("abc123", "session-xyz")
 
         assert result is True
@@ -212,68 +182,48 @@ class TestAuggieSessionId:
         call_args = mock_col.update_one.call_args[0][1]['$set']
         assert call_args['auggie_session_id'] == 'session-xyz'
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_save_auggie_session_id_no_chat_id(self, mock_cached, mock_collection_fn):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = True
-        mock_collection_fn.return_value = MagicMock()
-        repo = BotChatRepository()
+    def test_save_auggie_session_id_no_chat_id(self):
+        self.mocks.cached.return_value = True
+        self.mocks.col_fn.return_value = MagicMock()
+        repo = self.mocks.Repository()
         result = repo.save_auggie_session_id("", "session-xyz")
 
         assert result is False
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_save_auggie_session_id_no_session_id(self, mock_cached, mock_collection_fn):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = True
-        mock_collection_fn.return_value = MagicMock()
-        repo = BotChatRepository()
+    def test_save_auggie_session_id_no_session_id(self):
+        self.mocks.cached.return_value = True
+        self.mocks.col_fn.return_value = MagicMock()
+        repo = self.mocks.Repository()
         result = repo.save_auggie_session_id("abc123", "")
 
         assert result is False
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_get_auggie_session_id_exists(self, mock_cached, mock_collection_fn):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = True
+    def test_get_auggie_session_id_exists(self):
+        self.mocks.cached.return_value = True
         mock_col = MagicMock()
         mock_col.find_one.return_value = {'id': 'abc123', 'auggie_session_id': 'session-xyz'}
-        mock_collection_fn.return_value = mock_col
+        self.mocks.col_fn.return_value = mock_col
 
-        repo = BotChatRepository()
+        repo = self.mocks.Repository()
         result = repo.get_auggie_session_id("abc123")
 
         assert result == 'session-xyz'
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_get_auggie_session_id_not_found(self, mock_cached, mock_collection_fn):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = True
+    def test_get_auggie_session_id_not_found(self):
+        self.mocks.cached.return_value = True
         mock_col = MagicMock()
         mock_col.find_one.return_value = None
-        mock_collection_fn.return_value = mock_col
+        self.mocks.col_fn.return_value = mock_col
 
-        repo = BotChatRepository()
+        repo = self.mocks.Repository()
         result = repo.get_auggie_session_id("nonexistent")
 
         assert result is None
 
-    @patch('backend.services.bots.base_repository.get_bot_chats_collection')
-    @patch('backend.services.base_repository.is_db_available_cached')
-    def test_get_auggie_session_id_no_chat_id(self, mock_cached, mock_collection_fn):
-        from backend.services.bots.slack.bot_chat_repository import BotChatRepository
-
-        mock_cached.return_value = True
-        mock_collection_fn.return_value = MagicMock()
-        repo = BotChatRepository()
+    def test_get_auggie_session_id_no_chat_id(self):
+        self.mocks.cached.return_value = True
+        self.mocks.col_fn.return_value = MagicMock()
+        repo = self.mocks.Repository()
         result = repo.get_auggie_session_id("")
 
         assert result is None
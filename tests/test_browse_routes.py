@@ -11,12 +11,15 @@ from fastapi.testclient import TestClient
 from backend.app import app
 
 
-client = TestClient(app)
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as c:
+        yield c
 
 
 class TestBrowseDirectories:
 
-    def test_browse_home_directory(self):
+    def test_browse_home_directory(self, client):
         response = client.get('/api/browse')
         assert response.status_code == 200
         data = response.json()
@@ -24,21 +27,21 @@ class TestBrowseDirectories:
         assert 'items' in data
         assert isinstance(data['items'], list)
 
-    def test_browse_specific_path(self):
+    def test_browse_specific_path(self, client):
         response = client.get('/api/browse?path=/tmp')
         assert response.status_code == 200
         data = response.json()
         assert data['current'] == '/tmp'
         assert 'items' in data
 
-    def test_browse_invalid_path_falls_back_to_home(self):
+    def test_browse_invalid_path_falls_back_to_home(self, client):
         response = client.get('/api/browse?path=/nonexistent/path/xyz')
         assert response.status_code == 200
         data = response.json()
         assert 'current' in data
         assert data['current'] != '/nonexistent/path/xyz'
 
-    def test_browse_items_have_required_fields(self):
+    def test_browse_items_have_required_fields(self, client):
         response = client.get('/api/browse')
         assert response.status_code == 200
         data = response.json()
@@ -50,7 +53,7 @@ class TestBrowseDirectories:
             assert 'display_path' in item
             assert item['type'] == 'directory'
 
-    def test_browse_excludes_hidden_folders(self):
+    def test_browse_excludes_hidden_folders(self, client):
         response = client.get('/api/browse')
         assert response.status_code == 200
         data = response.json()
@@ -60,19 +63,19 @@ class TestBrowseDirectories:
 
 class TestSearchFolders:
 
-    def test_search_requires_minimum_query_length(self):
+    def test_search_requires_minimum_query_length(self, client):
         response = client.get('/api/search-folders?query=a')
         assert response.status_code == 200
         data = response.json()
         assert data['items'] == []
 
-    def test_search_empty_query_returns_empty(self):
+    def test_search_empty_query_returns_empty(self, client):
         response = client.get('/api/search-folders?query=')
         assert response.status_code == 200
         data = response.json()
         assert data['items'] == []
 
-    def test_search_returns_matching_folders(self):
+    def test_search_returns_matching_folders(self, client):
         with tempfile.TemporaryDirectory() as tmpdir:
             os.makedirs(os.path.join(tmpdir, 'test_folder_abc'))
             os.makedirs(os.path.join(tmpdir, 'another_folder'))
@@ -83,7 +86,7 @@ class TestSearchFolders:
             assert len(data['items']) >= 1
             assert any('abc' in item['name'].lower() for item in data['items'])
 
-    def test_search_is_case_insensitive(self):
+    def test_search_is_case_insensitive(self, client):
         with tempfile.TemporaryDirectory() as tmpdir:
             os.makedirs(os.path.join(tmpdir, 'TestFolder'))
             
@@ -92,7 +95,7 @@ class TestSearchFolders:
             data = response.json()
             assert len(data['items']) >= 1
 
-    def test_search_excludes_hidden_folders(self):
+    def test_search_excludes_hidden_folders(self, client):
         with tempfile.TemporaryDirectory() as tmpdir:
             os.makedirs(os.path.join(tmpdir, '.hidden_folder'))
             os.makedirs(os.path.join(tmpdir, 'visible_folder'))
@@ -103,7 +106,7 @@ class TestSearchFolders:
             for item in data['items']:
                 assert not item['name'].startswith('.')
 
-    def test_search_results_have_display_path(self):
+    def test_search_results_have_display_path(self, client):
         with tempfile.TemporaryDirectory() as tmpdir:
             os.makedirs(os.path.join(tmpdir, 'searchable'))
             
@@ -114,7 +117,7 @@ class TestSearchFolders:
                 item = data['items'][0]
                 assert 'display_path' in item
 
-    def test_search_recursive_finds_nested_folders(self):
+    def test_search_recursive_finds_nested_folders(self, client):
         with tempfile.TemporaryDirectory() as tmpdir:
             nested_path = os.path.join(tmpdir, 'level1', 'level2', 'target_folder')
             os.makedirs(nested_path)
@@ -125,7 +128,7 @@ class TestSearchFolders:
             assert len(data['items']) >= 1
             assert any('target' in item['name'].lower() for item in data['items'])
 
-    def test_search_limits_results(self):
+    def test_search_limits_results(self, client):
         with tempfile.TemporaryDirectory() as tmpdir:
             for i in range(60):
                 os.makedirs(os.path.join(tmpdir, f'match_{i}'))
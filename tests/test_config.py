@@ -17,7 +17,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.config import (
     Settings, AVAILABLE_MODELS, MODEL_ID_MAP, DEFAULT_MODEL,
-    get_auggie_model_id, SKIP_PATTERNS, BOX_CHARS_PATTERN
+    get_auggie_model_id, SKIP_PATTERNS, BOX_CHARS_PATTERN, _positive_float_env
 )
 
 
@@ -171,6 +171,25 @@ class TestEnvironmentVariables:
         settings = Settings()
         assert settings.slack_webhook_url == 'https://test.slack.com'
 
+    def test_positive_float_env_parses_value(self):
+        """Test a valid interval is read from the environment."""
+        with patch.dict(os.environ, {'TEST_INTERVAL': '2.5'}):
+            assert _positive_float_env('TEST_INTERVAL', 10.0) == 2.5
+
+    def test_positive_float_env_default_when_unset(self):
+        """Test the default is used when the variable is unset or empty."""
+        with patch.dict(os.environ, {'TEST_INTERVAL': ''}):
+            assert _positive_float_env('TEST_INTERVAL', 10.0) == 10.0
+        assert _positive_float_env('TEST_INTERVAL_UNSET', 10.0) == 10.0
+
+    def test_positive_float_env_rejects_bad_values(self, caplog):
+        """Test malformed, non-positive and infinite values fall back with a warning."""
+        for raw in ['abc', '0', '-5', 'inf', 'nan']:
+            caplog.clear()
+            with patch.dict(os.environ, {'TEST_INTERVAL': raw}):
+                assert _positive_float_env('TEST_INTERVAL', 10.0) == 10.0
+            assert 'TEST_INTERVAL' in caplog.text
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -5,10 +5,10 @@ Tests cover:
 - clean_assistant_content: Main cleaning method
 - _is_prompt_line: Detecting prompt indicators
 - _is_path_line: Detecting terminal path prompts
-- _is_empty_box_line: Detecting empty box formatting
-- _is_box_only_line: Detecting box-only lines
-- _is_garbage_line: Detecting escape code garbage
-- _clean_trailing_garbage: Removing trailing garbage
+- Empty box lines dropped by clean_assistant_content
+- Box-only lines dropped by clean_assistant_content
+- Escape code garbage lines dropped by clean_assistant_content
+- Trailing garbage removed by clean_assistant_content
 - strip_previous_response: Removing previous response from content
 """
 
@@ -130,91 +130,95 @@ class TestIsPathLine:
         assert ContentCleaner._is_path_line(long_path) == False
 
 
-class TestIsEmptyBoxLine:
-    """Test empty box line detection."""
+class TestEmptyBoxLines:
+    """Test that empty box lines are dropped."""
 
     def test_empty_box_line(self):
-        """Test detection of empty box line."""
+        """Test an empty box row is removed."""
         line = "│                                                                          │"
-        assert ContentCleaner._is_empty_box_line(line) == True
+        assert ContentCleaner.clean_assistant_content(f"Before\n{line}\nAfter") == "Before\nAfter"
 
     def test_non_empty_box_line(self):
-        """Test that non-empty box line is not detected."""
-        assert ContentCleaner._is_empty_box_line("│ Text │") == False
-        assert ContentCleaner._is_empty_box_line("Normal text") == False
+        """Test that a box row with text is kept."""
+        content = "Before\n│ Text │\nNormal text"
+        assert ContentCleaner.clean_assistant_content(content) == content
 
 
-class TestIsBoxOnlyLine:
-    """Test box-only line detection."""
+class TestBoxOnlyLines:
+    """Test that lines made only of box characters are dropped."""
 
     def test_box_characters(self):
         """Test lines with only box characters."""
-        assert ContentCleaner._is_box_only_line("───────") == True
-        assert ContentCleaner._is_box_only_line("│││") == True
-        assert ContentCleaner._is_box_only_line("╭─────╮") == True
+        for line in ["───────", "│││", "╭─────╮", "  ╰───╯  "]:
+            assert ContentCleaner.clean_assistant_content(f"Before\n{line}\nAfter") == "Before\nAfter"
 
     def test_mixed_content(self):
         """Test lines with text and box characters."""
-        assert ContentCleaner._is_box_only_line("│ Text │") == False
+        content = "Before\n│ Text │\nAfter"
+        assert ContentCleaner.clean_assistant_content(content) == content
+
+    def test_empty_line_kept(self):
+        """Test empty lines are not treated as box-only."""
+        assert ContentCleaner.clean_assistant_content("Before\n\nAfter") == "Before\n\nAfter"
+
+    def test_box_chars_around_text(self):
+        """Test box characters next to other text are kept."""
+        content = "Before\na───\n───a\nAfter"
+        assert ContentCleaner.clean_assistant_content(content) == content
 
-    def test_empty_string(self):
-        """Test empty string returns falsy value."""
-        # Empty string returns '' which is falsy (not False)
-        assert not ContentCleaner._is_box_only_line("")
 
+class TestGarbageLines:
+    """Test that escape code garbage lines are dropped."""
 
-class TestIsGarbageLine:
-    """Test garbage line detection."""
+    @staticmethod
+    def _drops(line: str) -> bool:
+        return ContentCleaner.clean_assistant_content(f"Before\n{line}\nAfter") == "Before\nAfter"
 
     def test_numeric_garbage(self):
         """Test numeric escape code remnants."""
-        assert ContentCleaner._is_garbage_line(";123") == True
-        assert ContentCleaner._is_garbage_line("45") == True
+        assert self._drops(";123")
+        assert self._drops("45")
 
     def test_terminal_ui_garbage(self):
         """Test terminal UI artifact detection (SA, cursor codes, etc)."""
-        assert ContentCleaner._is_garbage_line("SA") == True
-        assert ContentCleaner._is_garbage_line("A") == True
-        assert ContentCleaner._is_garbage_line("H") == True
-        assert ContentCleaner._is_garbage_line("K") == True
-        assert ContentCleaner._is_garbage_line("m") == True
-        assert ContentCleaner._is_garbage_line("1;5") == True
-        assert ContentCleaner._is_garbage_line("?25h") == True
-        assert ContentCleaner._is_garbage_line("?25l") == True
+        for line in ["SA", "A", "H", "K", "m", "1;5", "?25h", "?25l", "  K  "]:
+            assert self._drops(line), line
 
     def test_partial_escape_cleaning(self):
         """Test cleaning partial escape sequences from mid-line."""
-        assert ContentCleaner._clean_partial_escapes("Sen[2K") == "Sen"
-        assert ContentCleaner._clean_partial_escapes("text[1A more") == "text more"
-        assert ContentCleaner._clean_partial_escapes("foo[0m bar") == "foo bar"
-        assert ContentCleaner._clean_partial_escapes("[?25h visible") == " visible"
-        assert ContentCleaner._clean_partial_escapes("normal text") == "normal text"
-        assert ContentCleaner._clean_partial_escapes("color[38;2;255;0;0m red") == "color red"
+        assert ContentCleaner.clean_assistant_content("Sen[2K") == "Sen"
+        assert ContentCleaner.clean_assistant_content("text[1A more") == "text more"
+        assert ContentCleaner.clean_assistant_content("foo[0m bar") == "foo bar"
+        assert ContentCleaner.clean_assistant_content("Go\n[?25h visible") == "Go\n visible"
+        assert ContentCleaner.clean_assistant_content("normal text") == "normal text"
+        assert ContentCleaner.clean_assistant_content("color[38;2;255;0;0m red") == "color red"
 
     def test_normal_text(self):
         """Test normal text is not garbage."""
-        assert ContentCleaner._is_garbage_line("Hello") == False
-        assert ContentCleaner._is_garbage_line("Code 42") == False
-        assert ContentCleaner._is_garbage_line("Save the file") == False
-        assert ContentCleaner._is_garbage_line("USA") == False
+        for line in ["Hello", "Code 42", "Save the file", "USA"]:
+            assert not self._drops(line), line
 
     def test_empty_string(self):
-        """Test empty string is not garbage."""
-        assert ContentCleaner._is_garbage_line("") == False
+        """Test empty lines are not garbage."""
+        assert not self._drops("")
 
 
-class TestCleanTrailingGarbage:
+class TestTrailingGarbage:
     """Test trailing garbage removal."""
 
     def test_semicolon_ending(self):
         """Test removing trailing semicolon garbage."""
-        result = ContentCleaner._clean_trailing_garbage("Text;", "Text;")
-        assert result == "Text"
+        assert ContentCleaner.clean_assistant_content("Text;\nMore") == "Text\nMore"
+
+    def test_escape_number_ending(self):
+        """Test removing trailing ;NN and │NN remnants."""
+        assert ContentCleaner.clean_assistant_content("Value;38\nMore") == "Value\nMore"
+        assert ContentCleaner.clean_assistant_content("Cell│12\nMore") == "Cell│\nMore"
 
     def test_normal_line(self):
         """Test that normal lines are unchanged."""
-        result = ContentCleaner._clean_trailing_garbage("Normal text", "Normal text")
-        assert result == "Normal text"
+        content = "Normal text\nRoom 42\nMore"
+        assert ContentCleaner.clean_assistant_content(content) == content
 
 
 class TestStripPreviousResponse:
@@ -3,14 +3,17 @@ import os
 import pytest
 import shutil
 import tempfile
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime, timedelta, timezone
 
 from backend.storage.file_storage import FileStorage
 from backend.storage.collections import (
     BaseCollection, ChatsCollection, RemindersCollection, BotChatsCollection,
-    InsertResult, UpdateResult, DeleteResult
+    InsertResult, UpdateResult, DeleteResult, _now_iso
 )
 from backend.storage.index import StorageIndex
+from backend.storage.locking import LockManager, RWLock
+from filelock import Timeout
 
 
 @pytest.fixture
@@ -54,6 +57,61 @@ class TestFileStorage:
         result = file_storage.read('chats', 'nonexistent')
         assert result is None
 
+    def test_read_missing_file_for_indexed_doc(self, file_storage):
+        file_storage.write('chats', 'gone', {'id': 'gone', 'created_at': datetime.utcnow().isoformat()})
+        os.remove(file_storage.path_for('chats', 'gone'))
+        assert file_storage.read('chats', 'gone') is None
+
+    def test_read_large_document_via_mmap(self, file_storage, monkeypatch):
+        monkeypatch.setattr('backend.storage.file_storage.MMAP_READ_THRESHOLD', 16)
+        data = {'id': 'big', 'created_at': '2026-02-21', 'content': 'x' * 1000}
+        file_storage.write('chats', 'big', data)
+        assert file_storage.read('chats', 'big') == data
+
+    def test_write_is_atomic_and_leaves_no_temp_file(self, file_storage):
+        file_storage.write('chats', 'atomic', {'id': 'atomic', 'created_at': datetime.utcnow().isoformat()})
+        path = file_storage.path_for('chats', 'atomic')
+        assert os.path.exists(path)
+        assert not os.path.exists(f"{path}.tmp")
+
+    def test_write_stores_compact_json_with_newline(self, file_storage):
+        file_storage.write('chats', 'compact', {'id': 'compact', 'created_at': '2026-02-21', 'n': [1, 2]})
+        with open(file_storage.path_for('chats', 'compact'), 'rb') as f:
+            raw = f.read()
+        assert raw == b'{"id":"compact","created_at":"2026-02-21","n":[1,2]}\n'
+
+    def test_identical_rewrite_skips_disk_write(self, file_storage, monkeypatch):
+        data = {'id': 'same', 'created_at': '2026-02-21', 'title': 'A'}
+        assert file_storage.write('chats', 'same', data)
+
+        calls = []
+        original = file_storage._write_file
+        monkeypatch.setattr(file_storage, '_write_file', lambda *a: calls.append(a) or original(*a))
+
+        assert file_storage.write('chats', 'same', dict(data))
+        assert calls == []
+        assert file_storage.write('chats', 'same', dict(data, title='B'))
+        assert len(calls) == 1
+        assert file_storage.read('chats', 'same')['title'] == 'B'
+
+    def test_identical_rewrite_restores_missing_file(self, file_storage):
+        data = {'id': 'lost', 'created_at': '2026-02-21'}
+        file_storage.write('chats', 'lost', data)
+        os.remove(file_storage.path_for('chats', 'lost'))
+
+        assert file_storage.write('chats', 'lost', data)
+        assert file_storage.read('chats', 'lost') == data
+
+    def test_write_many_flushes_index_once(self, file_storage, monkeypatch):
+        index = file_storage.get_index('chats')
+        flushes = []
+        monkeypatch.setattr(index, 'flush', lambda: flushes.append(1))
+        items = [(f'bulk{i}', {'id': f'bulk{i}', 'created_at': '2026-02-21'}) for i in range(5)]
+
+        assert file_storage.write_many('chats', items + [('', {'id': ''}), ('bad', 'not a dict')]) == 5
+        assert len(flushes) == 1
+        assert file_storage.read('chats', 'bulk3') == {'id': 'bulk3', 'created_at': '2026-02-21'}
+
     def test_delete(self, file_storage):
         data = {'id': 'del123', 'created_at': datetime.utcnow().isoformat()}
         file_storage.write('chats', 'del123', data)
@@ -75,6 +133,22 @@ class TestFileStorage:
         assert 'chat1' in ids
         assert 'chat2' in ids
 
+    def test_list_all_reads_concurrently_in_index_order(self, file_storage, monkeypatch):
+        monkeypatch.setattr('backend.storage.file_storage.CONCURRENT_READ_MIN', 2)
+        for i in range(5):
+            file_storage.write('chats', f'c{i}', {'id': f'c{i}', 'created_at': '2026-02-21'})
+        os.remove(file_storage.path_for('chats', 'c2'))
+
+        assert [d['id'] for d in file_storage.list_all('chats')] == ['c0', 'c1', 'c3', 'c4']
+
+    def test_write_recreates_dir_removed_after_caching(self, file_storage):
+        now = datetime.utcnow().isoformat()
+        file_storage.write('chats', 'dir1', {'id': 'dir1', 'created_at': now})
+        shutil.rmtree(os.path.dirname(file_storage.path_for('chats', 'dir1')))
+
+        assert file_storage.write('chats', 'dir2', {'id': 'dir2', 'created_at': now})
+        assert file_storage.read('chats', 'dir2')['id'] == 'dir2'
+
     def test_file_path_structure(self, file_storage):
         created_at = '2026-02-21T10:30:00'
         path = file_storage.get_file_path('chats', 'abc123', created_at)
@@ -83,6 +157,25 @@ class TestFileStorage:
         assert '21' in path
         assert 'abc123.json' in path
 
+    def test_file_path_uses_date_prefix_without_parsing(self, file_storage):
+        path = file_storage.get_file_path('chats', 'tz', '2026-02-21T23:30:00-05:00')
+        assert path.endswith(os.path.join('chats', '2026', '02', '21', 'tz.json'))
+
+    def test_file_path_invalid_created_at_falls_back_to_now(self, file_storage):
+        path = file_storage.get_file_path('chats', 'bad', '2026-13-40T00:00:00')
+        today = datetime.now(timezone.utc)
+        assert os.path.join(today.strftime('%Y'), today.strftime('%m'), today.strftime('%d')) in path
+
+    @pytest.mark.parametrize('created_at', ['2026-02-31', '2026-02-29T10:00:00', '2026-01-05xyz'])
+    def test_file_path_rejects_impossible_or_trailing_dates(self, file_storage, created_at):
+        path = file_storage.get_file_path('chats', 'bad', created_at)
+        today = datetime.now(timezone.utc)
+        assert os.path.join(today.strftime('%Y'), today.strftime('%m'), today.strftime('%d')) in path
+
+    def test_file_path_accepts_leap_day_and_space_separator(self, file_storage):
+        path = file_storage.get_file_path('chats', 'leap', '2024-02-29 08:00:00')
+        assert path.endswith(os.path.join('chats', '2024', '02', '29', 'leap.json'))
+
 
 class TestStorageIndex:
     def test_set_and_get(self, temp_storage_dir):
@@ -112,6 +205,15 @@ class TestStorageIndex:
         assert 'doc1' in ids
         assert 'doc2' in ids
 
+    def test_iter_ids_walks_snapshot(self, temp_storage_dir):
+        index = StorageIndex(temp_storage_dir, 'test')
+        index.load()
+        index.set('doc1', '/path/1.json')
+
+        ids = index.iter_ids()
+        index.set('doc2', '/path/2.json')
+        assert list(ids) == ['doc1']
+
     def test_save_and_reload(self, temp_storage_dir):
         index = StorageIndex(temp_storage_dir, 'test')
         index.load()
@@ -122,6 +224,170 @@ class TestStorageIndex:
         index2.load()
         assert index2.get('doc1') == '/path/to/doc1.json'
 
+    def test_rebuild_indexes_dated_files_only(self, temp_storage_dir):
+        storage = FileStorage(temp_storage_dir)
+        storage.write('chats', 'r1', {'id': 'r1', 'created_at': '2026-01-05T10:00:00'})
+        storage.write('chats', 'r2', {'id': 'r2', 'created_at': '2026-02-06T10:00:00'})
+        stray_dir = os.path.join(temp_storage_dir, 'chats', '_archive', '01', '01')
+        os.makedirs(stray_dir)
+        with open(os.path.join(stray_dir, 'stray.json'), 'w') as f:
+            json.dump({'id': 'stray'}, f)
+        os.remove(os.path.join(temp_storage_dir, 'chats', '_index.json'))
+
+        index = StorageIndex(temp_storage_dir, 'chats')
+        index.load()
+        assert sorted(index.all_ids()) == ['r1', 'r2']
+
+    def test_rebuild_skips_corrupt_files(self, temp_storage_dir):
+        storage = FileStorage(temp_storage_dir)
+        for i in range(20):
+            storage.write('chats', f'ok{i}', {'id': f'ok{i}', 'created_at': '2026-01-05T10:00:00'})
+        day_dir = os.path.dirname(storage.path_for('chats', 'ok0'))
+        with open(os.path.join(day_dir, 'broken.json'), 'w') as f:
+            f.write('{ not json')
+        os.remove(os.path.join(temp_storage_dir, 'chats', '_index.json'))
+
+        index = StorageIndex(temp_storage_dir, 'chats')
+        index.load()
+        assert len(index.all_ids()) == 20
+
+    def test_flush_appends_journal_until_threshold(self, temp_storage_dir):
+        index = StorageIndex(temp_storage_dir, 'test')
+        index.load()
+        snapshot_mtime = os.path.getmtime(index.index_path)
+
+        index.set('doc1', '/path/1.json')
+        index.flush()
+        assert os.path.exists(index.journal_path)
+        assert os.path.getmtime(index.index_path) == snapshot_mtime
+
+        reloaded = StorageIndex(temp_storage_dir, 'test')
+        reloaded.load()
+        assert reloaded.get('doc1') == '/path/1.json'
+
+    def test_flush_compacts_at_threshold(self, temp_storage_dir):
+        index = StorageIndex(temp_storage_dir, 'test')
+        index.load()
+
+        for i in range(StorageIndex.COMPACT_THRESHOLD):
+            index.set(f'doc{i}', f'/path/{i}.json')
+            index.flush()
+
+        assert not os.path.exists(index.journal_path)
+        with open(index.index_path) as f:
+            assert len(json.load(f)) == StorageIndex.COMPACT_THRESHOLD
+
+    def test_journal_replays_deletes(self, temp_storage_dir):
+        index = StorageIndex(temp_storage_dir, 'test')
+        index.load()
+        index.set('doc1', '/path/1.json')
+        index.set('doc2', '/path/2.json')
+        index.delete('doc1')
+        index.flush()
+
+        reloaded = StorageIndex(temp_storage_dir, 'test')
+        reloaded.load()
+        assert reloaded.get('doc1') is None
+        assert reloaded.get('doc2') == '/path/2.json'
+
+    def test_all_entries_is_stable_snapshot(self, temp_storage_dir):
+        index = StorageIndex(temp_storage_dir, 'test')
+        index.load()
+        index.set('doc1', '/path/1.json')
+
+        snapshot = index.all_entries()
+        index.set('doc2', '/path/2.json')
+        index.delete('doc1')
+
+        assert list(snapshot) == ['doc1']
+        with pytest.raises(TypeError):
+            snapshot['doc3'] = {}
+
+    def test_writes_update_index_in_place(self, temp_storage_dir):
+        index = StorageIndex(temp_storage_dir, 'test')
+        index.load()
+        live = index._index
+
+        for i in range(10):
+            index.set(f'doc{i}', f'/path/{i}.json')
+        index.delete('doc0')
+
+        assert index._index is live
+        assert index.get('doc1') == '/path/1.json'
+
+    def test_snapshot_copied_once_per_change(self, temp_storage_dir):
+        index = StorageIndex(temp_storage_dir, 'test')
+        index.load()
+        index.set('doc1', '/path/1.json')
+
+        first = index._published()
+        assert index._published() is first
+        index.set('doc2', '/path/2.json')
+        assert index._published() is not first
+        assert sorted(index.all_ids()) == ['doc1', 'doc2']
+
+    def test_reads_do_not_wait_for_writer_lock(self, temp_storage_dir):
+        index = StorageIndex(temp_storage_dir, 'test')
+        index.load()
+        index.set('doc1', '/path/1.json', created_at='2026-01-01')
+
+        with index._lock:
+            result = []
+            reader = threading.Thread(target=lambda: result.append(
+                (index.get('doc1'), index.all_ids(), index.find_by_field('created_at', '2026-01-01'))))
+            reader.start()
+            reader.join(timeout=2)
+
+        assert result == [('/path/1.json', ['doc1'], ['doc1'])]
+
+
+class TestLocking:
+    def test_readers_share_lock(self):
+        lock = RWLock()
+        assert lock.acquire_read(timeout=0.1)
+        assert lock.acquire_read(timeout=0.1)
+        assert not lock.acquire_write(timeout=0.05)
+        lock.release_read()
+        lock.release_read()
+        assert lock.acquire_write(timeout=0.1)
+        lock.release_write()
+
+    def test_writer_excludes_readers(self):
+        lock = RWLock()
+        assert lock.acquire_write(timeout=0.1)
+        assert not lock.acquire_read(timeout=0.05)
+        lock.release_write()
+        assert lock.acquire_read(timeout=0.1)
+        lock.release_read()
+
+    def test_in_process_mode_skips_lock_file(self, temp_storage_dir):
+        manager = LockManager(multiprocess=False)
+        path = os.path.join(temp_storage_dir, 'doc.json')
+        with manager.write_lock(path):
+            pass
+        assert not os.path.exists(f"{path}.lock")
+
+    def test_default_manager_uses_in_process_locks(self):
+        assert LockManager().multiprocess is False
+
+    def test_multiprocess_mode_takes_lock_file(self, temp_storage_dir):
+        manager = LockManager(multiprocess=True)
+        path = os.path.join(temp_storage_dir, 'doc.json')
+        with manager.write_lock(path):
+            assert os.path.exists(f"{path}.lock")
+
+    def test_same_path_shares_lock_instance(self):
+        manager = LockManager(multiprocess=False)
+        assert manager.get_lock('/tmp/a.json') is manager.get_lock('/tmp/a.json')
+
+    def test_write_lock_timeout_raises(self, temp_storage_dir):
+        manager = LockManager(multiprocess=False)
+        path = os.path.join(temp_storage_dir, 'busy.json')
+        with manager.read_lock(path):
+            with pytest.raises(Timeout):
+                with manager.write_lock(path, timeout=0.05):
+                    pass
+
 
 class TestBaseCollection:
     def test_insert_one(self, chats_collection):
@@ -130,6 +396,19 @@ class TestBaseCollection:
         assert result.inserted_id is not None
         assert result.acknowledged
 
+    def test_insert_one_sets_parseable_timestamps(self, chats_collection):
+        chats_collection.insert_one({'id': 'ts1'})
+        doc = chats_collection.find_one({'id': 'ts1'})
+        created = datetime.fromisoformat(doc['created_at'])
+        assert abs((datetime.utcnow() - created).total_seconds()) < 5
+        assert doc['updated_at'] == doc['created_at']
+
+    def test_now_iso_matches_utc_clock(self):
+        before = datetime.utcnow()
+        stamp = datetime.fromisoformat(_now_iso())
+        after = datetime.utcnow()
+        assert before.replace(microsecond=0) <= stamp <= after
+
     def test_insert_one_preserves_id(self, chats_collection):
         result = chats_collection.insert_one({'id': 'custom123', 'title': 'Test'})
         assert result.inserted_id == 'custom123'
@@ -145,6 +424,22 @@ class TestBaseCollection:
         result = chats_collection.find_one({'id': 'nonexistent'})
         assert result is None
 
+    def test_find_one_stops_after_first_match(self, chats_collection):
+        for i in range(5):
+            chats_collection.insert_one({'id': f'c{i}', 'status': 'active'})
+
+        reads = []
+        original_read_at = chats_collection.storage.read_at
+
+        def counting_read_at(path):
+            reads.append(path)
+            return original_read_at(path)
+
+        chats_collection.storage.read_at = counting_read_at
+        result = chats_collection.find_one({'status': 'active'})
+        assert result is not None
+        assert len(reads) == 1
+
     def test_find_with_filter(self, chats_collection):
         chats_collection.insert_one({'id': 'c1', 'status': 'active'})
         chats_collection.insert_one({'id': 'c2', 'status': 'inactive'})
@@ -274,6 +569,14 @@ class TestBaseCollection:
         assert len(doc['messages']) == 1
         assert doc['messages'][0]['text'] == 'Hello'
 
+    def test_update_push_each(self, chats_collection):
+        chats_collection.insert_one({'id': 'p2', 'messages': ['a']})
+
+        chats_collection.update_one({'id': 'p2'}, {'$push': {'messages': {'$each': ['b', 'c']}}})
+
+        doc = chats_collection.find_one({'id': 'p2'})
+        assert doc['messages'] == ['a', 'b', 'c']
+
     def test_update_inc(self, chats_collection):
         chats_collection.insert_one({'id': 'i1', 'count': 5})
 
@@ -282,6 +585,32 @@ class TestBaseCollection:
         doc = chats_collection.find_one({'id': 'i1'})
         assert doc['count'] == 8
 
+    def test_update_unset_and_pull(self, chats_collection):
+        chats_collection.insert_one({'id': 'up1', 'tags': ['a', 'b', 'a'], 'temp': 1})
+
+        chats_collection.update_one({'id': 'up1'}, {'$unset': {'temp': ''}, '$pull': {'tags': 'a'}})
+
+        doc = chats_collection.find_one({'id': 'up1'})
+        assert 'temp' not in doc
+        assert doc['tags'] == ['b']
+
+    def test_update_one_by_filter_rewrites_located_file(self, chats_collection):
+        chats_collection.insert_one({'id': 'loc1', 'status': 'open', 'created_at': '2026-01-05T10:00:00'})
+        path = chats_collection.storage.path_for('chats', 'loc1')
+
+        chats_collection.update_one({'status': 'open'}, {'$set': {'status': 'closed'}})
+
+        assert chats_collection.storage.path_for('chats', 'loc1') == path
+        assert chats_collection.storage.read_at(path)['status'] == 'closed'
+
+    def test_update_unknown_operator_ignored(self, chats_collection):
+        chats_collection.insert_one({'id': 'up2', 'title': 'Keep'})
+
+        result = chats_collection.update_one({'id': 'up2'}, {'$rename': {'title': 'name'}})
+
+        assert result.matched_count == 1
+        assert chats_collection.find_one({'id': 'up2'})['title'] == 'Keep'
+
 
 class TestBotChatsCollection:
     def test_find_one_and_update(self, bot_chats_collection):
@@ -295,6 +624,18 @@ class TestBotChatsCollection:
         assert result is not None
         assert result['title'] == 'Updated'
 
+    def test_find_one_and_update_return_before(self, bot_chats_collection):
+        bot_chats_collection.insert_one({'id': 'bot2', 'title': 'Original', 'messages': []})
+
+        result = bot_chats_collection.find_one_and_update(
+            {'id': 'bot2'},
+            {'$set': {'title': 'Updated'}, '$push': {'messages': 'hi'}},
+            return_document='before'
+        )
+        assert result['title'] == 'Original'
+        assert result['messages'] == []
+        assert bot_chats_collection.find_one({'id': 'bot2'})['title'] == 'Updated'
+
     def test_find_one_and_update_upsert(self, bot_chats_collection):
         result = bot_chats_collection.find_one_and_update(
             {'lookup_key': 'slack:123'},
@@ -382,6 +723,14 @@ class TestEdgeCases:
         assert all(results)
         assert len(file_storage.list_all('chats')) == 10
 
+    def test_non_json_values_stored_as_strings(self, file_storage):
+        stamp = datetime(2026, 2, 21, 10, 30)
+        file_storage.write('chats', 'dt1', {'id': 'dt1', 'created_at': '2026-02-21', 'seen_at': stamp, 1: 'int key'})
+
+        doc = file_storage.read('chats', 'dt1')
+        assert doc['seen_at'] == str(stamp)
+        assert doc['1'] == 'int key'
+
     def test_special_characters_in_content(self, chats_collection):
         special_content = 'Test with "quotes" and \'apostrophes\' and\nnewlines'
         chats_collection.insert_one({'id': 'special', 'content': special_content})
@@ -523,6 +872,12 @@ class TestRobustness:
         result = file_storage.write('chats', 'test/with\\special:chars?', data)
         assert result is True
 
+    def test_sanitize_doc_id_replaces_unsafe_chars(self, file_storage):
+        assert file_storage._sanitize_doc_id('a/b\\c:d?é日-_Z9') == 'a_b_c_d___-_Z9'
+        assert file_storage._sanitize_doc_id('x' * 150) == 'x' * 100
+        with pytest.raises(ValueError):
+            file_storage._sanitize_doc_id('')
+
     def test_very_long_doc_id(self, file_storage):
         long_id = 'a' * 200
         data = {'id': long_id, 'created_at': datetime.utcnow().isoformat()}
@@ -40,6 +40,14 @@ class TestExtractFull:
         result = ResponseExtractor.extract_full(output, "What is AI?")
         assert result == ""
 
+    def test_missing_marker_skips_stripping(self, monkeypatch):
+        """Test that output without the marker returns before ANSI stripping."""
+        from backend.utils.text import TextCleaner
+        calls = []
+        monkeypatch.setattr(TextCleaner, 'strip_terminal', staticmethod(lambda text: calls.append(text) or text))
+        assert ResponseExtractor.extract_full("\x1b[31mno marker here\x1b[0m", "What is AI?") == ""
+        assert calls == []
+
     def test_basic_extraction(self):
         """Test basic response extraction."""
         output = """Some preamble
@@ -8,15 +8,23 @@ deleted during cleanup or reset operations.
 import pytest
 import sys
 import os
+import threading
 import time
 from unittest.mock import MagicMock, patch
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import backend.session.auggie as auggie_module
 from backend.session.auggie import AuggieSession, SessionManager, _sessions, _lock
 
 
+@pytest.fixture(autouse=True)
+def sweep_executor():
+    with patch('backend.session.auggie._sweep_executor') as executor:
+        yield executor
+
+
 class TestAuggieSessionInUse:
     """Test AuggieSession in_use flag behavior."""
 
@@ -36,6 +44,33 @@ class TestAuggieSessionInUse:
         assert session.in_use == False
 
 
+class TestAuggieSessionLaunchConfig:
+    """Test AuggieSession command uses the cached binary and env is read per spawn."""
+
+    def test_env_includes_workspace_and_term(self):
+        session = AuggieSession('/tmp/test-env-workspace')
+        env = session.get_env()
+        assert env['AUGMENT_WORKSPACE'] == '/tmp/test-env-workspace'
+        assert env['TERM'] == 'xterm-256color'
+
+    def test_env_is_isolated_per_session(self):
+        env_a = AuggieSession('/tmp/ws-a').get_env()
+        env_b = AuggieSession('/tmp/ws-b').get_env()
+        assert env_a is not env_b
+        assert env_a['AUGMENT_WORKSPACE'] == '/tmp/ws-a'
+        assert env_b['AUGMENT_WORKSPACE'] == '/tmp/ws-b'
+
+    def test_env_picks_up_later_environment_changes(self, monkeypatch):
+        monkeypatch.setenv('AUGMENT_SESSION_AUTH', 'refreshed-token')
+        env = AuggieSession('/tmp/test-env-refresh').get_env()
+        assert env['AUGMENT_SESSION_AUTH'] == 'refreshed-token'
+
+    def test_command_uses_cached_binary_path(self):
+        with patch('backend.session.auggie._AUGGIE_PATH', '/opt/auggie'):
+            cmd = AuggieSession('/tmp/test-cmd').get_command()
+        assert cmd[0] == '/opt/auggie'
+
+
 class TestSessionManagerCleanupOld:
     """Test SessionManager.cleanup_old() respects in_use flag."""
 
@@ -60,7 +95,7 @@ class TestSessionManagerCleanupOld:
         
         # Create a mock session that's old but in use
         session = AuggieSession(workspace)
-        session.last_used = time.time() - 700  # Over 600 seconds old
+        session.last_used = time.monotonic() - 700  # Over 600 seconds old
         session.in_use = True
         session.process = MagicMock()
         session.process.poll.return_value = None  # Process is alive
@@ -70,7 +105,7 @@ class TestSessionManagerCleanupOld:
             _sessions[workspace] = session
         
         # Run cleanup
-        with patch('backend.session.cleanup_stale_auggie_processes'):
+        with patch('backend.session.auggie.cleanup_stale_auggie_processes'):
             SessionManager.cleanup_old()
         
         # Session should still exist because it's in use
@@ -84,7 +119,7 @@ class TestSessionManagerCleanupOld:
         
         # Create a mock session that's old and not in use
         session = AuggieSession(workspace)
-        session.last_used = time.time() - 700  # Over 600 seconds old
+        session.last_used = time.monotonic() - 700  # Over 600 seconds old
         session.in_use = False
         session.process = None  # No process to clean up
         session.master_fd = None
@@ -93,7 +128,7 @@ class TestSessionManagerCleanupOld:
             _sessions[workspace] = session
         
         # Run cleanup
-        with patch('backend.session.cleanup_stale_auggie_processes'):
+        with patch('backend.session.auggie.cleanup_stale_auggie_processes'):
             SessionManager.cleanup_old()
         
         # Session should be removed
@@ -106,14 +141,14 @@ class TestSessionManagerCleanupOld:
         
         # Create a mock session that's recent
         session = AuggieSession(workspace)
-        session.last_used = time.time() - 100  # Only 100 seconds old
+        session.last_used = time.monotonic() - 100  # Only 100 seconds old
         session.in_use = False
         
         with _lock:
             _sessions[workspace] = session
         
         # Run cleanup
-        with patch('backend.session.cleanup_stale_auggie_processes'):
+        with patch('backend.session.auggie.cleanup_stale_auggie_processes'):
             SessionManager.cleanup_old()
         
         # Session should still exist
@@ -154,7 +189,7 @@ class TestSessionManagerReset:
             _sessions[workspace] = session
         
         # Try to reset
-        with patch('backend.session.cleanup_stale_auggie_processes'):
+        with patch('backend.session.auggie.cleanup_stale_auggie_processes'):
             result = SessionManager.reset(workspace)
         
         # Should return False and session should still exist
@@ -176,7 +211,7 @@ class TestSessionManagerReset:
             _sessions[workspace] = session
         
         # Reset
-        with patch('backend.session.cleanup_stale_auggie_processes'):
+        with patch('backend.session.auggie.cleanup_stale_auggie_processes'):
             result = SessionManager.reset(workspace)
         
         # Should return True and session should be removed
@@ -219,7 +254,7 @@ class TestSessionManagerWithSessionId:
         """Test that get_or_create stores session_id in new session."""
         workspace = '/tmp/test-session-id'
 
-        with patch('backend.session.start_cleanup_thread'):
+        with patch('backend.session.auggie._schedule_cleanup_sweep'):
             session, is_new = SessionManager.get_or_create(
                 workspace, model='test', session_id='xyz-789'
             )
@@ -241,7 +276,7 @@ class TestSessionManagerWithSessionId:
         with _lock:
             _sessions[workspace] = existing
 
-        with patch('backend.session.start_cleanup_thread'):
+        with patch('backend.session.auggie._schedule_cleanup_sweep'):
             session, is_new = SessionManager.get_or_create(
                 workspace, session_id='existing-123'
             )
@@ -263,7 +298,7 @@ class TestSessionManagerWithSessionId:
         with _lock:
             _sessions[workspace] = existing
 
-        with patch('backend.session.start_cleanup_thread'):
+        with patch('backend.session.auggie._schedule_cleanup_sweep'):
             with patch.object(existing, 'cleanup') as mock_cleanup:
                 session, is_new = SessionManager.get_or_create(
                     workspace, session_id='new-session', force_new=True
@@ -273,6 +308,45 @@ class TestSessionManagerWithSessionId:
         assert session.session_id == 'new-session'
         mock_cleanup.assert_called_once()
 
+    def test_reuse_waits_for_in_flight_replacement(self):
+        """A session replaced while the caller waits on _lock is not handed out."""
+        workspace = '/tmp/test-reuse-race'
+
+        def live_session():
+            session = AuggieSession(workspace, session_id='same-session')
+            session.process = MagicMock(pid=12345)
+            session.process.poll.return_value = None
+            return session
+
+        existing = live_session()
+        replacement = live_session()
+        with _lock:
+            _sessions[workspace] = existing
+
+        checked = threading.Event()
+        real_can_reuse = auggie_module._can_reuse
+
+        def can_reuse(*args, **kwargs):
+            result = real_can_reuse(*args, **kwargs)
+            checked.set()
+            return result
+
+        result = {}
+
+        def caller():
+            result['value'] = SessionManager.get_or_create(workspace, session_id='same-session')
+
+        with patch('backend.session.auggie._schedule_cleanup_sweep'), \
+                patch('backend.session.auggie._can_reuse', side_effect=can_reuse):
+            with _lock:
+                worker = threading.Thread(target=caller)
+                worker.start()
+                assert checked.wait(timeout=5)
+                _sessions[workspace] = replacement
+            worker.join(timeout=5)
+
+        assert result['value'] == (replacement, False)
+
     def test_force_new_false_reuses_existing_session_same_id(self):
         """Test that force_new=False reuses existing session when session_id matches."""
         workspace = '/tmp/test-force-new-false'
@@ -287,7 +361,7 @@ class TestSessionManagerWithSessionId:
         with _lock:
             _sessions[workspace] = existing
 
-        with patch('backend.session.start_cleanup_thread'):
+        with patch('backend.session.auggie._schedule_cleanup_sweep'):
             session, is_new = SessionManager.get_or_create(
                 workspace, session_id='same-session', force_new=False
             )
@@ -299,7 +373,7 @@ class TestSessionManagerWithSessionId:
         """Test that force_new=True creates new session when no existing session."""
         workspace = '/tmp/test-force-new-no-existing'
 
-        with patch('backend.session.start_cleanup_thread'):
+        with patch('backend.session.auggie._schedule_cleanup_sweep'):
             session, is_new = SessionManager.get_or_create(
                 workspace, session_id='brand-new', force_new=True
             )
@@ -321,7 +395,7 @@ class TestSessionManagerWithSessionId:
         with _lock:
             _sessions[workspace] = existing
 
-        with patch('backend.session.start_cleanup_thread'):
+        with patch('backend.session.auggie._schedule_cleanup_sweep'):
             with patch.object(existing, 'cleanup') as mock_cleanup:
                 session, is_new = SessionManager.get_or_create(
                     workspace, session_id='session-B', force_new=False
@@ -345,7 +419,7 @@ class TestSessionManagerWithSessionId:
         with _lock:
             _sessions[workspace] = existing
 
-        with patch('backend.session.start_cleanup_thread'):
+        with patch('backend.session.auggie._schedule_cleanup_sweep'):
             with patch.object(existing, 'cleanup') as mock_cleanup:
                 session, is_new = SessionManager.get_or_create(
                     workspace, session_id='new-session-id', force_new=False
@@ -369,7 +443,7 @@ class TestSessionManagerWithSessionId:
         with _lock:
             _sessions[workspace] = existing
 
-        with patch('backend.session.start_cleanup_thread'):
+        with patch('backend.session.auggie._schedule_cleanup_sweep'):
             session, is_new = SessionManager.get_or_create(
                 workspace, session_id=None, force_new=False
             )
@@ -379,6 +453,30 @@ class TestSessionManagerWithSessionId:
         assert session is existing
 
 
+class TestCleanupSweepScheduling:
+    """Test the opportunistic cleanup sweep replaces the polling thread."""
+
+    def test_sweep_submitted_once_per_interval(self):
+        with patch('backend.session.auggie._last_sweep', float('-inf')), \
+             patch('backend.session.auggie._sweep_executor') as mock_executor:
+            from backend.session import auggie
+            auggie._schedule_cleanup_sweep()
+            auggie._schedule_cleanup_sweep()
+
+        assert mock_executor.submit.call_count == 1
+
+    def test_session_cleanup_schedules_sweep(self, sweep_executor):
+        with patch('backend.session.auggie._last_sweep', float('-inf')):
+            AuggieSession('/tmp/test-cleanup-sweep').cleanup()
+
+        sweep_executor.submit.assert_called_once()
+
+    def test_sweep_swallows_errors(self):
+        from backend.session import auggie
+        with patch('backend.session.auggie.cleanup_stale_auggie_processes', side_effect=RuntimeError('boom')):
+            auggie._run_cleanup_sweep()
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
 
@@ -47,6 +47,15 @@ class TestSlackBotConfig:
             assert config.workspace == '/test/workspace'
             assert config.model == 'claude-opus-4.5'
 
+    def test_ping_interval_defaults_to_config(self):
+        with patch.dict(os.environ, {}, clear=True), \
+                patch('backend.services.bots.slack.bot.SLACK_SOCKET_PING_INTERVAL', 25.0):
+            assert SlackBotConfig().ping_interval == 25.0
+
+    def test_explicit_zero_ping_interval_kept(self):
+        with patch.dict(os.environ, {}, clear=True):
+            assert SlackBotConfig(ping_interval=0).ping_interval == 0
+
     def test_explicit_values_override_env(self):
         env = {'SLACK_BOT_TOKEN': 'env-token'}
         with patch.dict(os.environ, env, clear=True):
@@ -283,6 +292,18 @@ class TestSlackBotSocketMode:
         with pytest.raises(ValueError, match="Socket Mode requires"):
             bot.start_socket_mode()
 
+    def test_socket_mode_passes_ping_interval(self):
+        with patch.dict(os.environ, {}, clear=True):
+            config = SlackBotConfig(bot_token='xoxb-test', app_token='xapp-test', ping_interval=30)
+        bot = SlackBot(config)
+        bot._app = MagicMock()
+
+        with patch('slack_bolt.adapter.socket_mode.SocketModeHandler') as handler_cls:
+            bot.start_socket_mode(blocking=True)
+
+        handler_cls.assert_called_once_with(bot._app, 'xapp-test', ping_interval=30)
+        handler_cls.return_value.start.assert_called_once()
+
 
 class TestSlackBotExceptionHandling:
 
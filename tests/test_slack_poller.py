@@ -0,0 +1,60 @@
+"""
+Tests for slack/poller.py - Slack polling bot.
+
+Tests cover:
+- SlackPoller idle back-off of the poll interval
+- SlackPoller.stop waking the poll loop
+"""
+
+import sys
+import os
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.bots.slack.poller import SlackPoller
+
+
+class TestSlackPollerInterval:
+
+    def setup_method(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.poller = SlackPoller(poll_interval=2.0, max_poll_interval=10.0)
+
+    def test_doubles_while_idle(self):
+        assert self.poller._next_interval(2.0, had_messages=False) == 4.0
+        assert self.poller._next_interval(4.0, had_messages=False) == 8.0
+
+    def test_capped_at_max(self):
+        assert self.poller._next_interval(8.0, had_messages=False) == 10.0
+        assert self.poller._next_interval(10.0, had_messages=False) == 10.0
+
+    def test_resets_to_min_on_activity(self):
+        assert self.poller._next_interval(10.0, had_messages=True) == 2.0
+
+    def test_max_below_min_keeps_min(self):
+        with patch.dict(os.environ, {}, clear=True):
+            poller = SlackPoller(poll_interval=5.0, max_poll_interval=1.0)
+        assert poller._next_interval(5.0, had_messages=False) == 5.0
+
+
+class TestSlackPollerStop:
+
+    def test_stop_interrupts_idle_wait(self):
+        with patch.dict(os.environ, {}, clear=True):
+            poller = SlackPoller(bot_token='xoxb-test', channel_id='C123', poll_interval=30.0, max_poll_interval=30.0)
+
+        with patch.object(SlackPoller, '_ensure_client'), \
+                patch.object(SlackPoller, '_get_bot_user_id', return_value='UBOT'), \
+                patch.object(SlackPoller, '_fetch_new_messages', return_value=[]) as fetch:
+            poller.start()
+            while not fetch.called:
+                time.sleep(0.01)
+
+            started = time.monotonic()
+            poller.stop()
+            poller._thread.join(timeout=5)
+
+        assert not poller._thread.is_alive()
+        assert time.monotonic() - started < 2
@@ -5,6 +5,8 @@ from unittest.mock import MagicMock, patch
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+_FROZEN_ISO = "2025-01-01T00:00:00"
+
 
 class TestTelegramChatRepositoryInit:
 
@@ -80,17 +82,15 @@ class TestGetOrCreateChat:
     @patch('backend.services.base_repository.is_db_available_cached')
     def test_create_new_chat(self, mock_cached, mock_collection_fn):
         from backend.services.bots.telegram.bot_chat_repository import TelegramChatRepository
-        from datetime import datetime
 
         mock_cached.return_value = True
         mock_col = MagicMock()
-        now = datetime.utcnow().isoformat()
         mock_col.find_one_and_update.return_value = {
             'id': 'new-chat',
             'lookup_key': '123456:789012',
             'user_id': '123456',
             'telegram_chat_id': '789012',
-            'created_at': now
+            'created_at': _FROZEN_ISO
         }
         mock_collection_fn.return_value = mock_col
 
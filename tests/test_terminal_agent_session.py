@@ -94,6 +94,37 @@ class TestTerminalSession:
         result = session.drain_output()
         assert result == ''
 
+    def test_discard_output_no_fd(self):
+        provider = MockProvider()
+        session = TerminalSession(provider, '/tmp')
+        assert session.discard_output() == 0
+
+    def test_discard_output_counts_pending_bytes(self):
+        provider = MockProvider()
+        session = TerminalSession(provider, '/tmp')
+        read_fd, write_fd = os.pipe()
+        try:
+            os.write(write_fd, b'x' * 50000)
+            os.close(write_fd)
+            session.master_fd = read_fd
+            assert session.discard_output(timeout=1.0) == 50000
+        finally:
+            session.master_fd = None
+            os.close(read_fd)
+
+    def test_drain_output_returns_pending_text(self):
+        provider = MockProvider()
+        session = TerminalSession(provider, '/tmp')
+        read_fd, write_fd = os.pipe()
+        try:
+            os.write(write_fd, 'héllo ✓'.encode('utf-8') * 2000)
+            os.close(write_fd)
+            session.master_fd = read_fd
+            assert session.drain_output(timeout=1.0) == 'héllo ✓' * 2000
+        finally:
+            session.master_fd = None
+            os.close(read_fd)
+
     def test_wait_for_prompt_no_fd(self):
         provider = MockProvider()
         session = TerminalSession(provider, '/tmp')
@@ -85,6 +85,26 @@ class TestStripAnsi:
         assert result == "Line 1\nLine 2"
 
 
+class TestStripTerminal:
+    """Test combined ANSI and control character stripping."""
+
+    def test_strips_ansi_and_control_chars(self):
+        text = "\x1b[31mRed\x00 text\x07\x1b[0m\tend\r\n"
+        assert TextCleaner.strip_terminal(text) == "Red text\tend\r\n"
+
+    def test_matches_strip_ansi_for_plain_escapes(self):
+        text = "\x1b[1;32mOK\x1b[0m 38;5;200 done"
+        assert TextCleaner.strip_terminal(text) == TextCleaner.strip_ansi(text)
+
+    def test_status_text_matched_case_insensitively(self):
+        text = "Working \x1b[2m(ESC To Interrupt)\x1b[0m \x01Sending Request... (2s)done"
+        assert TextCleaner.strip_terminal(text) == "Working  done"
+
+    def test_plain_text_without_status_cues(self):
+        text = "Plain \x1b[1mtext\x1b[0m ⠋ with 12;2;3 numbers\x0b"
+        assert TextCleaner.strip_terminal(text) == "Plain text  with  numbers"
+
+
 class TestCleanResponse:
     """Test response cleaning."""
 